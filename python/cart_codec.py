@@ -0,0 +1,189 @@
+"""
+Compact, versioned binary format for parking carts and handing them between lanes.
+
+    header      magic "CART", version, item count, coupon count, coupon bytes
+    quantities  item count little-endian float64
+    line prices item count little-endian float64, NaN when not fixed at the lane
+                (version 2; version 1 records have no such column)
+    product ids item count little-endian uint32 (ids come from a ProductIndex)
+    coupons     product id, validity ordinals, offer type, code, JSON argument
+
+The float columns come first so they stay 8-byte aligned within the record, and
+park_carts pads each record to a multiple of 8 bytes so that holds for every
+record in a bulk buffer. Restoring
+through CartView reads the id and quantity columns as memoryviews over the
+buffer without copying them.
+"""
+
+import datetime
+import json
+import math
+import struct
+import sys
+from array import array
+
+from model_objects import SpecialOfferType
+from shopping_cart import ShoppingCart
+
+MAGIC = b"CART"
+FORMAT_VERSION = 2
+_NOT_FIXED = float("nan")
+
+_HEADER = struct.Struct("<4sHHIIQ")  # magic, version, coupons, items, coupon bytes, reserved
+_COUPON = struct.Struct("<IIIBH")     # product id, start ordinal, end ordinal, offer type, code length
+_ARGUMENT_LENGTH = struct.Struct("<H")
+_RECORD_LENGTH = struct.Struct("<Q")
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class ProductIndex:
+    """Stable product <-> id mapping shared by the lanes that exchange carts."""
+
+    def __init__(self, products=()):
+        self._ids = {}
+        self._products = []
+        for product in products:
+            self.add(product)
+
+    def add(self, product):
+        product_id = self._ids.get(product)
+        if product_id is None:
+            product_id = self._ids[product] = len(self._products)
+            self._products.append(product)
+        return product_id
+
+    def id_of(self, product):
+        return self._ids[product]
+
+    def product(self, product_id):
+        return self._products[product_id]
+
+
+def _column(typecode, values):
+    column = array(typecode, values)
+    if not _NATIVE_LITTLE_ENDIAN:
+        column.byteswap()
+    return column.tobytes()
+
+
+def encode_cart(cart, index):
+    items = cart.items
+    parts = [b"", _column('d', [item.quantity for item in items]),
+             _column('d', [_NOT_FIXED if item.line_price is None else item.line_price for item in items]),
+             _column('I', [index.id_of(item.product) for item in items])]
+    coupon_bytes = 0
+    for coupon in cart.coupons:
+        code = coupon.code.encode("utf-8")
+        argument = json.dumps(coupon.argument).encode("utf-8")
+        record = (_COUPON.pack(index.id_of(coupon.product), coupon.start_date.toordinal(),
+                               coupon.end_date.toordinal(), coupon.offer_type.value, len(code))
+                  + code + _ARGUMENT_LENGTH.pack(len(argument)) + argument)
+        parts.append(record)
+        coupon_bytes += len(record)
+    parts[0] = _HEADER.pack(MAGIC, FORMAT_VERSION, len(cart.coupons), len(items), coupon_bytes, 0)
+    return b"".join(parts)
+
+
+class CartView:
+    """A parked cart read in place from a buffer."""
+
+    def __init__(self, buffer, offset=0):
+        view = memoryview(buffer)
+        if len(view) - offset < _HEADER.size:
+            raise ValueError("Truncated cart: incomplete header")
+        magic, version, self.coupon_count, self.item_count, coupon_bytes, _ = _HEADER.unpack_from(view, offset)
+        if magic != MAGIC:
+            raise ValueError("Not a parked cart")
+        if version not in (1, FORMAT_VERSION):
+            raise ValueError(f"Unsupported cart format version: {version}")
+        start = offset + _HEADER.size
+        prices_start = start + 8 * self.item_count
+        ids_start = prices_start + (8 * self.item_count if version >= 2 else 0)
+        coupons_start = ids_start + 4 * self.item_count
+        self.size = coupons_start + coupon_bytes - offset
+        if len(view) - offset < self.size:
+            raise ValueError(f"Truncated cart: header announces {self.size} bytes, "
+                             f"buffer holds {len(view) - offset}")
+        if _NATIVE_LITTLE_ENDIAN:
+            self.quantities = view[start:prices_start].cast('d')
+            self.line_prices = view[prices_start:ids_start].cast('d')
+            self.product_ids = view[ids_start:coupons_start].cast('I')
+        else:
+            self.quantities = _swapped('d', view[start:prices_start])
+            self.line_prices = _swapped('d', view[prices_start:ids_start])
+            self.product_ids = _swapped('I', view[ids_start:coupons_start])
+        if version < 2:
+            self.line_prices = array('d', [_NOT_FIXED]) * self.item_count
+        self._coupons = view[coupons_start:coupons_start + coupon_bytes]
+
+    def coupons(self, index):
+        view = self._coupons
+        offset = 0
+        for _ in range(self.coupon_count):
+            product_id, start, end, offer_type, code_length = _COUPON.unpack_from(view, offset)
+            offset += _COUPON.size
+            code = bytes(view[offset:offset + code_length]).decode("utf-8")
+            offset += code_length
+            (argument_length,) = _ARGUMENT_LENGTH.unpack_from(view, offset)
+            offset += _ARGUMENT_LENGTH.size
+            argument = json.loads(bytes(view[offset:offset + argument_length]))
+            offset += argument_length
+            yield (index.product(product_id), code, datetime.date.fromordinal(start),
+                   datetime.date.fromordinal(end), SpecialOfferType(offer_type), argument)
+
+    def restore(self, index):
+        cart = ShoppingCart()
+        product = index.product
+        for product_id, quantity, line_price in zip(self.product_ids, self.quantities, self.line_prices):
+            cart.add_item_quantity(product(product_id), quantity, None if math.isnan(line_price) else line_price)
+        for coupon in self.coupons(index):
+            cart.add_coupon(*coupon)
+        return cart
+
+
+def _swapped(typecode, view):
+    column = array(typecode, bytes(view))
+    column.byteswap()
+    return column
+
+
+def decode_cart(buffer, index):
+    return CartView(buffer).restore(index)
+
+
+def _padding(length):
+    return -length % 8
+
+
+def park_carts(carts, index):
+    """Packs many carts into one buffer, each prefixed with its length and
+    padded so the next record starts 8-byte aligned."""
+    parts = []
+    for cart in carts:
+        encoded = encode_cart(cart, index)
+        parts.append(_RECORD_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+        parts.append(bytes(_padding(len(encoded))))
+    return b"".join(parts)
+
+
+def parked_cart_views(buffer):
+    view = memoryview(buffer)
+    offset = 0
+    while offset < len(view):
+        if len(view) - offset < _RECORD_LENGTH.size:
+            raise ValueError("Truncated parked carts: incomplete record length")
+        (length,) = _RECORD_LENGTH.unpack_from(view, offset)
+        offset += _RECORD_LENGTH.size
+        if len(view) - offset < length:
+            raise ValueError(f"Truncated parked carts: record announces {length} bytes, "
+                             f"buffer holds {len(view) - offset}")
+        cart_view = CartView(view[offset:offset + length])
+        if cart_view.size != length:
+            raise ValueError(f"Corrupt parked carts: record of {length} bytes holds a {cart_view.size}-byte cart")
+        yield cart_view
+        offset += length + _padding(length)
+
+
+def restore_carts(buffer, index):
+    return [cart_view.restore(index) for cart_view in parked_cart_views(buffer)]
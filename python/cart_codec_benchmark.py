@@ -0,0 +1,56 @@
+"""
+Compares parking and restoring carts with the binary cart format against pickle.
+
+python cart_codec_benchmark.py [carts]
+"""
+
+import datetime
+import pickle
+import random
+import sys
+import time
+
+from cart_codec import ProductIndex, park_carts, restore_carts
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+
+
+def sample_carts(count, seed=7):
+    rng = random.Random(seed)
+    products = [Product(f"product {i}", ProductUnit.EACH if i % 3 else ProductUnit.KILO) for i in range(500)]
+    today = datetime.date.today()
+    carts = []
+    for _ in range(count):
+        cart = ShoppingCart()
+        for product in rng.sample(products, rng.randint(1, 30)):
+            quantity = round(rng.uniform(0.1, 3.0), 3) if product.unit == ProductUnit.KILO else float(rng.randint(1, 6))
+            cart.add_item_quantity(product, quantity)
+        if rng.random() < 0.2:
+            cart.add_coupon(cart.items[0].product, "DEAL", today, today + datetime.timedelta(days=7),
+                            SpecialOfferType.COUPON_DISCOUNT, {'threshold': 1, 'limit': 2, 'percent': 50.0})
+        carts.append(cart)
+    return carts, ProductIndex(products)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main(args):
+    count = int(args[0]) if args else 10_000
+    carts, index = sample_carts(count)
+
+    parked, park_time = timed(lambda: park_carts(carts, index))
+    _, restore_time = timed(lambda: restore_carts(parked, index))
+    pickled, pickle_time = timed(lambda: pickle.dumps(carts, protocol=pickle.HIGHEST_PROTOCOL))
+    _, unpickle_time = timed(lambda: pickle.loads(pickled))
+
+    print(f"{'':<8} {'bytes':>10} {'park carts/s':>14} {'restore carts/s':>16}")
+    print(f"{'binary':<8} {len(parked):>10} {count / park_time:>14.0f} {count / restore_time:>16.0f}")
+    print(f"{'pickle':<8} {len(pickled):>10} {count / pickle_time:>14.0f} {count / unpickle_time:>16.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+"""
+Load generator for checkout_server.py: keep-alive connections posting random carts.
+
+python checkout_loadgen.py [connections] [requests per connection] [port]
+"""
+
+import asyncio
+import json
+import random
+import sys
+import time
+
+PRODUCTS = ["toothbrush", "apples", "toothpaste", "orange juice"]
+
+
+def random_cart(rng):
+    items = [{"name": name, "quantity": float(rng.randint(1, 6))}
+             for name in rng.sample(PRODUCTS, rng.randint(1, len(PRODUCTS)))]
+    return json.dumps({"items": items, "points": rng.choice([0, 0, 15])}).encode("utf-8")
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    return status, await reader.readexactly(length)
+
+
+async def _connection(host, port, requests, latencies, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            body = random_cart(rng)
+            start = time.perf_counter()
+            writer.write(b"POST /checkout HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+            await writer.drain()
+            status, _ = await _read_response(reader)
+            if status != 200:
+                raise RuntimeError(f"checkout failed with HTTP {status}")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run(connections=32, requests=200, host="127.0.0.1", port=8080):
+    """Returns (requests per second, p50 seconds, p99 seconds)."""
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_connection(host, port, requests, latencies, seed) for seed in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / elapsed, p50, p99
+
+
+def main(args):
+    connections = int(args[0]) if args else 32
+    requests = int(args[1]) if len(args) > 1 else 200
+    port = int(args[2]) if len(args) > 2 else 8080
+    rps, p50, p99 = asyncio.run(run(connections, requests, port=port))
+    print(f"{connections * requests} requests: {rps:.0f} req/s, p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,249 @@
+"""
+Long-lived local checkout service.
+
+Keeps the catalog, Teller and offers warm, accepts JSON carts over HTTP/1.1
+keep-alive connections and prices concurrent requests in micro-batches.
+
+A request that finds the queue empty is priced at once. When requests pile
+up, the ones arriving within `batch_window` are priced back to back against
+one rules snapshot and one DiscountCalculator, so the resolution table and
+offer lookups are set up once per batch; repeated lines across carts also
+share the Teller's DiscountMemo.
+
+python checkout_server.py [port]
+
+    POST /checkout  {"items": [{"name": "apples", "quantity": 1.5}], "points": 15,
+                     "date": "2025-01-01", "format": "json" | "text"}
+    GET  /health
+"""
+
+import asyncio
+import datetime
+import json
+import logging
+import sys
+
+from receipt_printer import ReceiptPrinter
+from shopping_cart import ShoppingCart
+
+log = logging.getLogger(__name__)
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def receipt_to_json(receipt):
+    return {
+        "items": [{"name": item.product.name, "quantity": item.quantity, "price": item.price,
+                   "total_price": item.total_price} for item in receipt.items],
+        "discounts": [{"name": discount.product.name if discount.product else None,
+                       "description": discount.description, "amount": discount.discount_amount}
+                      for discount in receipt.discounts],
+        "total": receipt.total_price(),
+        "loyalty_points": receipt.loyalty_points,
+    }
+
+
+class CheckoutJob:
+    __slots__ = ("cart", "current_date", "points", "future")
+
+    def __init__(self, cart, current_date, points, future):
+        self.cart = cart
+        self.current_date = current_date
+        self.points = points
+        self.future = future
+
+
+class CheckoutServer:
+    def __init__(self, teller, catalog, batch_window=0.002, max_batch=64, offer_feed=None, feed_interval=1.0):
+        self.teller = teller
+        self.catalog = catalog
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.offer_feed = offer_feed
+        self.feed_interval = feed_interval
+        self.printer = ReceiptPrinter()
+        self.requests = 0
+        self.batches = 0
+        self._queue = None
+        self._server = None
+        self._tasks = []
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self._queue = asyncio.Queue()
+        self._tasks.append(asyncio.create_task(self._run_batches()))
+        if self.offer_feed is not None:
+            self._tasks.append(asyncio.create_task(self._watch_offers()))
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def checkout(self, cart, current_date, points):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(CheckoutJob(cart, current_date, points, future))
+        return await future
+
+    async def _watch_offers(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # A large reload takes a while; keep serving checkouts meanwhile.
+            try:
+                changes = await loop.run_in_executor(None, self.offer_feed.poll)
+            except Exception:
+                log.exception("Offer feed reload failed; retrying in %.1fs", self.feed_interval)
+            else:
+                for line, error in changes.rejected:
+                    log.warning("Rejected offer feed row %r: %s", line, error)
+            await asyncio.sleep(self.feed_interval)
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # Nothing else is waiting: don't hold a lone request for the window.
+            deadline = loop.time() + (self.batch_window if not self._queue.empty() else 0)
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._price_batch(batch)
+
+    def _price_batch(self, batch):
+        self.batches += 1
+        calculator = self.teller.calculator()
+        for job in batch:
+            if job.future.cancelled():
+                continue
+            try:
+                receipt = self.teller.checks_out_articles_from(job.cart, job.current_date, job.points,
+                                                               calculator=calculator)
+            except Exception as e:
+                job.future.set_exception(e)
+            else:
+                job.future.set_result(receipt)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                method, path, version, headers = self._parse_head(head)
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                keep_alive = self._keep_alive(version, headers)
+                status, content_type, payload = await self._respond(method, path, body)
+                writer.write(self._response(status, content_type, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            return
+        finally:
+            writer.close()
+
+    def _parse_head(self, head):
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, version = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        return method, path, version, headers
+
+    def _keep_alive(self, version, headers):
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def _response(self, status, content_type, payload, keep_alive):
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode("latin-1") + payload
+
+    async def _respond(self, method, path, body):
+        if path == "/health":
+            return 200, "text/plain", b"ok\n"
+        if path != "/checkout":
+            return 404, "text/plain", b"not found\n"
+        if method != "POST":
+            return 405, "text/plain", b"use POST\n"
+        self.requests += 1
+        try:
+            request = json.loads(body)
+            cart, current_date, points, output = self._parse_checkout(request)
+        except (BadRequest, ValueError, KeyError, TypeError) as e:
+            return 400, "application/json", json.dumps({"error": str(e)}).encode("utf-8")
+        try:
+            receipt = await self.checkout(cart, current_date, points)
+        except Exception as e:
+            return 500, "application/json", json.dumps({"error": str(e)}).encode("utf-8")
+        if output == "text":
+            return 200, "text/plain; charset=utf-8", self.printer.print_receipt(receipt).encode("utf-8")
+        return 200, "application/json", json.dumps(receipt_to_json(receipt)).encode("utf-8")
+
+    def _parse_checkout(self, request):
+        cart = ShoppingCart()
+        for item in request["items"]:
+            product = self.catalog.products.get(item["name"])
+            if product is None:
+                raise BadRequest(f"unknown product: {item['name']}")
+            cart.add_item_quantity(product, float(item.get("quantity", 1.0)))
+        current_date = request.get("date")
+        current_date = datetime.date.fromisoformat(current_date) if current_date else datetime.date.today()
+        output = request.get("format", "json")
+        if output not in ("json", "text"):
+            raise BadRequest(f"unknown format: {output}")
+        return cart, current_date, int(request.get("points", 0)), output
+
+
+async def serve(port):
+    from pathlib import Path
+    from offer_feed import OfferFeed
+    from teller import Teller
+    from texttest_fixture import read_catalog
+
+    catalog = read_catalog(Path("files/catalog.csv"))
+    teller = Teller(catalog)
+    feed = OfferFeed("files/offers.csv", catalog, teller)
+    server = await CheckoutServer(teller, catalog, offer_feed=feed).start(port=port)
+    print(f"Checkout service listening on http://127.0.0.1:{server.port}")
+    await server.serve_forever()
+
+
+def main(args):
+    port = int(args[0]) if args else 8080
+    try:
+        asyncio.run(serve(port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
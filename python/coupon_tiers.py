@@ -0,0 +1,121 @@
+"""
+Tiered coupons and stacking several coupons on one product.
+
+A tier is the classic coupon rule: items beyond `threshold`, at most `limit`
+of them, get `percent` off. A coupon argument either holds one tier
+({'threshold': 6, 'limit': 6, 'percent': 50.0}) or a list of them under
+'tiers'; deeper tiers are expected to be better deals, so the best tier for a
+quantity is the one with the highest threshold it passes.
+"""
+
+import sys
+from bisect import bisect_left
+
+# Upper bound on DP work (coupons x quantity x choices) before stacking falls
+# back to applying coupons one after another.
+MAX_STACKING_CELLS = 200_000
+
+
+class CouponTier:
+    __slots__ = ("threshold", "limit", "percent", "description")
+
+    def __init__(self, threshold, limit, percent):
+        self.threshold = threshold
+        self.limit = limit
+        self.percent = percent
+        self.description = sys.intern(f"Coupon {percent}% off next {limit} items")
+
+    @property
+    def max_items(self):
+        return self.threshold + self.limit
+
+    def savings(self, items, unit_price):
+        discountable_items = min(items - self.threshold, self.limit)
+        return discountable_items * unit_price * (self.percent / 100.0)
+
+
+class TieredCoupon:
+    def __init__(self, tiers):
+        self.tiers = sorted(tiers, key=lambda tier: tier.threshold)
+        self._thresholds = [tier.threshold for tier in self.tiers]
+
+    @classmethod
+    def from_argument(cls, argument):
+        if 'tiers' in argument:
+            return cls([CouponTier(t['threshold'], t['limit'], t['percent']) for t in argument['tiers']])
+        return cls([CouponTier(argument['threshold'], argument['limit'], argument['percent'])])
+
+    def best_tier(self, whole_items):
+        """Tier that saves the most on `whole_items`, or None when no threshold is
+        passed. Binary search finds the tiers passed; among equal savings the one
+        consuming more items wins, as in best_stack."""
+        best = None
+        best_key = None
+        for tier in self.tiers[:bisect_left(self._thresholds, whole_items)]:
+            # Savings scale with the unit price, so compare them per unit.
+            key = (min(whole_items - tier.threshold, tier.limit) * tier.percent,
+                   min(whole_items, tier.max_items))
+            if best_key is None or key > best_key:
+                best, best_key = tier, key
+        return best
+
+    @property
+    def max_items(self):
+        return max(tier.max_items for tier in self.tiers)
+
+
+def best_stack(coupons, whole_items, unit_price, max_cells=MAX_STACKING_CELLS):
+    """Best way to share `whole_items` between several TieredCoupons on one product.
+
+    Returns [(coupon index, tier, items consumed)] for the coupons that apply,
+    maximizing the total savings; among equal savings, more items are consumed,
+    as one coupon on its own would. Returns None when the problem is larger
+    than `max_cells`.
+    """
+    capacity = min(whole_items, sum(coupon.max_items for coupon in coupons))
+    # Tier ranges bound both the tables built below and the DP over them, so
+    # check the cost before building anything.
+    options = sum(max(0, min(tier.max_items, capacity) - tier.threshold)
+                  for coupon in coupons for tier in coupon.tiers)
+    if options * (capacity + 1) > max_cells:
+        return None
+    choices = []
+    for coupon in coupons:
+        # For each number of items consumed, the tier that saves the most.
+        best = {}
+        for tier in coupon.tiers:
+            for items in range(tier.threshold + 1, min(tier.max_items, capacity) + 1):
+                saving = tier.savings(items, unit_price)
+                if items not in best or saving > best[items][0]:
+                    best[items] = (saving, tier)
+        choices.append(sorted(best.items()))
+
+    unreachable = float("-inf")
+    savings = [0.0] + [unreachable] * capacity
+    picks = []
+    for options in choices:
+        updated = savings[:]
+        pick = [None] * (capacity + 1)
+        for used, total in enumerate(savings):
+            if total == unreachable:
+                continue
+            for items, (saving, tier) in options:
+                if used + items > capacity:
+                    break
+                if total + saving > updated[used + items]:
+                    updated[used + items] = total + saving
+                    pick[used + items] = (items, tier)
+        savings = updated
+        picks.append(pick)
+
+    best_total = max(savings)
+    used = max(u for u, total in enumerate(savings) if total == best_total)
+    stack = []
+    for index in range(len(coupons) - 1, -1, -1):
+        choice = picks[index][used]
+        if choice is not None:
+            items, tier = choice
+            stack.append((index, tier, items))
+            used -= items
+    stack.reverse()
+    return stack
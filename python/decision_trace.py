@@ -0,0 +1,61 @@
+import random
+
+
+class TraceEvent:
+    __slots__ = ("kind", "subject", "outcome", "amount", "consumed")
+
+    def __init__(self, kind, subject, outcome, amount=None, consumed=None):
+        self.kind = kind
+        self.subject = subject
+        self.outcome = outcome
+        self.amount = amount
+        self.consumed = consumed    # {product name: quantity} taken out of the cart
+
+    def __repr__(self):
+        return f"TraceEvent({self.kind!r}, {self.subject!r}, {self.outcome!r}, {self.amount!r}, {self.consumed!r})"
+
+
+class DecisionTrace:
+    """Why each discount was or was not given during one checkout.
+
+    Events go into a ring buffer allocated up front; once it is full the oldest
+    events are overwritten and counted in `dropped`, so a pathological cart
+    cannot make tracing expensive.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._events = [None] * capacity
+        self._recorded = 0
+
+    @property
+    def dropped(self):
+        return max(0, self._recorded - self.capacity)
+
+    def record(self, kind, subject, outcome, amount=None, consumed=None):
+        self._events[self._recorded % self.capacity] = TraceEvent(kind, subject, outcome, amount, consumed)
+        self._recorded += 1
+
+    def events(self):
+        if self._recorded <= self.capacity:
+            return self._events[:self._recorded]
+        start = self._recorded % self.capacity
+        return self._events[start:] + self._events[:start]
+
+    def format(self):
+        lines = []
+        if self.dropped:
+            lines.append(f"... {self.dropped} earlier decisions dropped")
+        for event in self.events():
+            line = f"{event.kind:<7} {event.subject}: {event.outcome}"
+            if event.amount is not None:
+                line += f" ({event.amount:.2f})"
+            if event.consumed:
+                line += " consumed " + ", ".join(f"{name} x {qty:g}" for name, qty in event.consumed.items())
+            lines.append(line)
+        return "\n".join(lines) + "\n"
+
+
+def sampled_trace(rate, capacity=256, rng=random.random):
+    """A fresh trace for roughly `rate` of checkouts, otherwise None (tracing off)."""
+    return DecisionTrace(capacity) if rng() < rate else None
@@ -1,15 +1,34 @@
 from model_objects import Discount, OfferFactory, SpecialOfferType
+from offer_resolution import ResolutionTable
+from pricing_profiler import BUNDLE, COUPON, OFFER
+from coupon_tiers import TieredCoupon, best_stack
 
 class DiscountCalculator:
-    def __init__(self, catalog, offers, bundle_offers):
+    def __init__(self, catalog, offers, bundle_offers, resolution_table=None, profiler=None, trace=None,
+                 memo=None):
         self.catalog = catalog
+        self.memo = memo
+        self.profiler = profiler
+        self.trace = trace
         self.offers = offers
         self.bundle_offers = bundle_offers
-        self.offer_factory = OfferFactory()
+        self._offer_factory = None
+        if resolution_table is None:
+            resolution_table = ResolutionTable.build(offers, bundle_offers)
+        self.resolution_table = resolution_table
+
+    @property
+    def offer_factory(self):
+        # Only coupons create offers at checkout; most carts never need a factory.
+        if self._offer_factory is None:
+            self._offer_factory = OfferFactory()
+        return self._offer_factory
 
     def calculate_discounts(self, product_quantities, coupons, current_date):
         discounts = []
-        remaining_quantities = product_quantities.copy()
+        remaining_quantities = self._promoted_quantities(product_quantities, coupons)
+        if not remaining_quantities:
+            return discounts
         
         discounts.extend(self._calculate_bundle_discounts(remaining_quantities))
 
@@ -19,67 +38,179 @@ class DiscountCalculator:
 
         return discounts
     
+    def _promoted_quantities(self, product_quantities, coupons):
+        # Lines without any rule never get a discount, so they skip the engine.
+        table = self.resolution_table
+        coupon_products = {coupon.product for coupon in coupons}
+        return {product: quantity for product, quantity in product_quantities.items()
+                if product in table or product in coupon_products}
+
     def _calculate_bundle_discounts(self, remaining_quantities):
         discounts = []
-        while True:
+        profiler = self.profiler
+        trace = self.trace
+        bundle_offers = self.resolution_table.candidate_bundles(remaining_quantities)
+        while bundle_offers:
             best_offer = None
             best_savings = 0.0
             
-            for bundle in self.bundle_offers:
+            for bundle in bundle_offers:
+                started = profiler.clock() if profiler else 0
                 if bundle.can_apply_bundle(remaining_quantities):
                     savings = bundle.get_discount_amount(self.catalog)
                     if savings > best_savings:
                         best_savings = savings
                         best_offer = bundle
+                    if trace is not None:
+                        trace.record(BUNDLE, bundle.get_description(), "candidate", savings)
+                elif trace is not None:
+                    trace.record(BUNDLE, bundle.get_description(), "incomplete")
+                if profiler:
+                    profiler.evaluated(BUNDLE, bundle.get_description(), started)
             
             if best_offer:
                 best_offer.consume(remaining_quantities)
                 discounts.append(Discount(None, best_offer.get_description(), -best_savings))
+                if profiler:
+                    profiler.applied(BUNDLE, best_offer.get_description(), best_savings)
+                if trace is not None:
+                    trace.record(BUNDLE, best_offer.get_description(), "applied", best_savings,
+                                 {p.name: qty for p, qty in best_offer.bundle_spec.items()})
             else:
                 break
         return discounts
 
     def _calculate_coupon_discounts(self, remaining_quantities, coupons, current_date):
         discounts = []
+        profiler = self.profiler
+        stacks = self._coupon_stacks(coupons, current_date)
+        stacked_discounts = {}
         for coupon in coupons:
-            if not (coupon.start_date <= current_date <= coupon.end_date):
-                continue
-            
-            if coupon.product not in remaining_quantities:
-                continue
-
-            offer = self.offer_factory.create(coupon.offer_type, coupon.product, coupon.argument)
-            
-            quantity = remaining_quantities[coupon.product]
-            unit_price = self.catalog.unit_price(coupon.product)
-            
-            discount = offer.calculate_discount(quantity, unit_price)
-            
+            started = profiler.clock() if profiler else 0
+            stack = stacks.get(coupon.product)
+            if stack is not None and coupon in stack:
+                if id(coupon) not in stacked_discounts:
+                    stacked_discounts.update(self._calculate_stacked_coupon_discounts(remaining_quantities, stack,
+                                                                                       current_date))
+                discount = stacked_discounts[id(coupon)]
+            else:
+                discount = self._calculate_coupon_discount(remaining_quantities, coupon, current_date)
+            if profiler:
+                profiler.evaluated(COUPON, coupon.code, started)
+                if discount:
+                    profiler.applied(COUPON, coupon.code, -discount.discount_amount)
             if discount:
                 discounts.append(discount)
-                self._consume_coupon_items(remaining_quantities, coupon, quantity)
                 
         return discounts
 
-    def _consume_coupon_items(self, remaining_quantities, coupon, current_quantity):
+    def _coupon_stacks(self, coupons, current_date):
+        # Products carrying several valid percentage coupons share their items
+        # between them optimally instead of first-come-first-served.
+        by_product = {}
+        for coupon in coupons:
+            if (coupon.offer_type == SpecialOfferType.COUPON_DISCOUNT
+                    and coupon.start_date <= current_date <= coupon.end_date):
+                by_product.setdefault(coupon.product, []).append(coupon)
+        return {product: stack for product, stack in by_product.items() if len(stack) > 1}
+
+    def _calculate_stacked_coupon_discounts(self, remaining_quantities, stack, current_date):
+        trace = self.trace
+        product = stack[0].product
+        results = {id(coupon): None for coupon in stack}
+        if product not in remaining_quantities:
+            if trace is not None:
+                for coupon in stack:
+                    trace.record(COUPON, coupon.code, f"rejected: no {product.name} left to discount")
+            return results
+
+        quantity = remaining_quantities[product]
+        unit_price = self.catalog.unit_price(product)
+        picks = best_stack([TieredCoupon.from_argument(c.argument) for c in stack], int(quantity), unit_price)
+        if picks is None:
+            for coupon in stack:
+                results[id(coupon)] = self._calculate_coupon_discount(remaining_quantities, coupon, current_date)
+            return results
+
+        for index, tier, items in picks:
+            coupon = stack[index]
+            results[id(coupon)] = Discount(product, tier.description, -tier.savings(items, unit_price))
+            remaining_quantities[product] -= items
+            if trace is not None:
+                trace.record(COUPON, coupon.code, "accepted", tier.savings(items, unit_price),
+                             {product.name: items})
+        if remaining_quantities[product] <= 0:
+            del remaining_quantities[product]
+        if trace is not None:
+            for coupon in stack:
+                if results[id(coupon)] is None:
+                    trace.record(COUPON, coupon.code, "rejected: stacked coupons make better use of the items")
+        return results
+
+    def _calculate_coupon_discount(self, remaining_quantities, coupon, current_date):
+        trace = self.trace
+        if not (coupon.start_date <= current_date <= coupon.end_date):
+            if trace is not None:
+                trace.record(COUPON, coupon.code, f"rejected: {current_date} outside "
+                                                  f"{coupon.start_date}..{coupon.end_date}")
+            return None
+        
+        if coupon.product not in remaining_quantities:
+            if trace is not None:
+                trace.record(COUPON, coupon.code, f"rejected: no {coupon.product.name} left to discount")
+            return None
+
+        offer = self.offer_factory.create(coupon.offer_type, coupon.product, coupon.argument)
+        
+        quantity = remaining_quantities[coupon.product]
+        unit_price = self.catalog.unit_price(coupon.product)
+        
+        discount = offer.calculate_discount(quantity, unit_price)
+        
+        if discount:
+            items_used = self._consume_coupon_items(remaining_quantities, coupon, offer, quantity)
+            if trace is not None:
+                trace.record(COUPON, coupon.code, "accepted", -discount.discount_amount,
+                             {coupon.product.name: items_used})
+        elif trace is not None:
+            trace.record(COUPON, coupon.code, f"rejected: {quantity:g} {coupon.product.name} do not qualify")
+        return discount
+
+    def _consume_coupon_items(self, remaining_quantities, coupon, offer, current_quantity):
         if coupon.offer_type == SpecialOfferType.COUPON_DISCOUNT:
-            arg = coupon.argument
-            max_items_affected = arg['threshold'] + arg['limit']
-            items_used = min(current_quantity, max_items_affected)
+            items_used = offer.items_consumed(current_quantity)
             remaining_quantities[coupon.product] -= items_used
         else:
+            items_used = current_quantity
             del remaining_quantities[coupon.product]
             
         if coupon.product in remaining_quantities and remaining_quantities[coupon.product] <= 0:
             del remaining_quantities[coupon.product]
+        return items_used
 
     def _calculate_standard_discounts(self, remaining_quantities):
         discounts = []
+        profiler = self.profiler
         for product, quantity in remaining_quantities.items():
-            if product in self.offers:
-                offer = self.offers[product]
+            rules = self.resolution_table.get(product)
+            if rules is not None and rules.offer is not None:
+                started = profiler.clock() if profiler else 0
+                offer = rules.offer
                 unit_price = self.catalog.unit_price(product)
-                discount = offer.calculate_discount(quantity, unit_price)
+                if self.memo is not None:
+                    discount = self.memo.discount(offer, quantity, unit_price)
+                else:
+                    discount = offer.calculate_discount(quantity, unit_price)
+                if profiler:
+                    profiler.evaluated(OFFER, product.name, started)
+                    if discount:
+                        profiler.applied(OFFER, product.name, -discount.discount_amount)
+                if self.trace is not None:
+                    if discount:
+                        self.trace.record(OFFER, product.name, discount.description,
+                                          -discount.discount_amount, {product.name: quantity})
+                    else:
+                        self.trace.record(OFFER, product.name, f"not applied to {quantity:g}")
                 if discount:
                     discounts.append(discount)
         return discounts
\ No newline at end of file
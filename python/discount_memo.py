@@ -0,0 +1,47 @@
+_MISSING = object()
+
+
+class DiscountMemo:
+    """Bounded table of offer results shared across carts.
+
+    The same (offer, quantity, unit price) lines repeat constantly, so the
+    Discount computed for one cart is reused as-is for every later one, which
+    is safe because Discount is immutable. Eviction is first-in-first-out,
+    which keeps lookups lock-free for lanes sharing one Teller.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def discount(self, offer, quantity, unit_price):
+        key = (offer, quantity, unit_price)
+        discount = self._entries.get(key, _MISSING)
+        if discount is not _MISSING:
+            self.hits += 1
+            return discount
+        self.misses += 1
+        discount = offer.calculate_discount(quantity, unit_price)
+        if len(self._entries) >= self.max_entries:
+            try:
+                del self._entries[next(iter(self._entries))]
+                self.evictions += 1
+            except (KeyError, StopIteration, RuntimeError):
+                pass
+        self._entries[key] = discount
+        return discount
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,56 @@
+"""
+Compares computing every standard offer discount with sharing them through DiscountMemo,
+on a repeated-basket distribution: most lines are 1-3 units of popular products.
+
+python discount_memo_benchmark.py [lines]
+"""
+
+import random
+import sys
+import time
+
+from discount_memo import DiscountMemo
+from model_objects import Product, ProductUnit, SpecialOfferType, OfferFactory
+
+OFFER_TYPES = [(SpecialOfferType.THREE_FOR_TWO, 0.0), (SpecialOfferType.TEN_PERCENT_DISCOUNT, 10.0),
+               (SpecialOfferType.TWO_FOR_AMOUNT, 1.5), (SpecialOfferType.FIVE_FOR_AMOUNT, 4.0)]
+QUANTITIES = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 12.0]
+QUANTITY_WEIGHTS = [55, 20, 10, 5, 4, 4, 2]
+
+
+def sample_lines(count, products=300, seed=11):
+    rng = random.Random(seed)
+    factory = OfferFactory()
+    offers = []
+    for i in range(products):
+        offer_type, argument = OFFER_TYPES[i % len(OFFER_TYPES)]
+        offers.append((factory.create(offer_type, Product(f"product {i}", ProductUnit.EACH), argument),
+                       round(0.5 + (i % 40) * 0.25, 2)))
+    # Popularity follows a Zipf-like curve.
+    popularity = [1.0 / (rank + 1) for rank in range(products)]
+    chosen = rng.choices(offers, weights=popularity, k=count)
+    quantities = rng.choices(QUANTITIES, weights=QUANTITY_WEIGHTS, k=count)
+    return [(offer, quantity, price) for (offer, price), quantity in zip(chosen, quantities)]
+
+
+def main(args):
+    count = int(args[0]) if args else 500_000
+    lines = sample_lines(count)
+
+    start = time.perf_counter()
+    for offer, quantity, price in lines:
+        offer.calculate_discount(quantity, price)
+    direct = time.perf_counter() - start
+
+    memo = DiscountMemo()
+    start = time.perf_counter()
+    for offer, quantity, price in lines:
+        memo.discount(offer, quantity, price)
+    memoized = time.perf_counter() - start
+
+    print(f"{count} lines: direct {direct / count * 1e9:.0f} ns/line, memo {memoized / count * 1e9:.0f} ns/line "
+          f"({direct / memoized:.2f}x), hit rate {memo.hit_rate:.1%}, {len(memo)} entries")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
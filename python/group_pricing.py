@@ -0,0 +1,42 @@
+
+from array import array
+
+
+def whole_items(quantity):
+    return quantity // 1
+
+
+def groups_of(quantity, group_size):
+    return whole_items(quantity) // group_size
+
+
+def group_discount(quantity, unit_price, group_size, group_price):
+    """Savings of selling `quantity` items in groups of `group_size` at `group_price` each.
+
+    Lines without a complete group save nothing. Only arithmetic and comparison
+    operators are used, so the same kernel prices a single line (floats) or a
+    whole column of lines at once (NumPy arrays of quantities, unit prices and
+    group prices).
+    """
+    items = whole_items(quantity)
+    groups = items // group_size
+    remainder = items % group_size
+    return (quantity * unit_price - (groups * group_price + remainder * unit_price)) * (groups >= 1)
+
+
+def buy_n_pay_m_discount(quantity, unit_price, buy, pay):
+    return group_discount(quantity, unit_price, buy, pay * unit_price)
+
+
+def n_for_amount_discount(quantity, unit_price, count, amount):
+    return group_discount(quantity, unit_price, count, amount)
+
+
+def group_discounts(quantities, unit_prices, group_size, group_prices):
+    """Batch form of `group_discount`. Columns with elementwise operators (NumPy
+    arrays) go through the kernel in one call; lists, tuples and arrays from the
+    array module are priced line by line."""
+    if isinstance(quantities, (list, tuple, array)):
+        return [group_discount(quantity, unit_price, group_size, group_price)
+                for quantity, unit_price, group_price in zip(quantities, unit_prices, group_prices)]
+    return group_discount(quantities, unit_prices, group_size, group_prices)
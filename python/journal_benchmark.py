@@ -0,0 +1,58 @@
+"""
+Measures durable receipts per second through the group-commit receipt journal.
+
+python journal_benchmark.py [lanes] [receipts per lane]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from model_objects import Product, ProductUnit, Discount
+from receipt import Receipt
+from receipt_journal import ReceiptJournal, read_journal
+
+
+def sample_receipt():
+    receipt = Receipt()
+    toothbrush = Product("toothbrush", ProductUnit.EACH)
+    apples = Product("apples", ProductUnit.KILO)
+    receipt.add_product(toothbrush, 3.0, 0.99, 2.97)
+    receipt.add_product(apples, 1.25, 1.99, 2.4875)
+    receipt.add_discount(Discount(toothbrush, "3 for 2", -0.99))
+    receipt.add_loyalty_points(4)
+    return receipt
+
+
+def run(lanes, receipts_per_lane):
+    receipt = sample_receipt()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "receipts.journal")
+        with ReceiptJournal(path) as journal:
+            def lane():
+                for _ in range(receipts_per_lane):
+                    journal.append(receipt)
+
+            threads = [threading.Thread(target=lane) for _ in range(lanes)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+        written = sum(1 for _ in read_journal(path))
+    return written, elapsed
+
+
+def main(args):
+    lanes = int(args[0]) if args else 32
+    receipts_per_lane = int(args[1]) if len(args) > 1 else 200
+    written, elapsed = run(lanes, receipts_per_lane)
+    print(f"{written} durable receipts from {lanes} lanes in {elapsed:.2f}s "
+          f"({written / elapsed:.0f} receipts/s)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,228 @@
+"""
+Differential check of this pricing engine against the legacy python_pytest tree.
+
+Generates random catalogs, offers and carts over the offer types both trees
+support, checks out every cart with both implementations, asserts identical
+receipts and reports how much slower or faster this engine is.
+
+python legacy_equivalence.py [carts] [seed] [--record results.jsonl]
+
+With --record, the run is also gated against the last ratio recorded in that
+file: more than REGRESSION_TOLERANCE slower than the previous run fails.
+"""
+
+import datetime
+import gc
+import importlib
+import json
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LEGACY_SRC = os.path.join(os.path.dirname(HERE), "python_pytest", "src")
+LEGACY_MODULES = ["catalog", "model_objects", "receipt", "shopping_cart", "teller"]
+SHARED_OFFER_TYPES = ["THREE_FOR_TWO", "TEN_PERCENT_DISCOUNT", "TWO_FOR_AMOUNT", "FIVE_FOR_AMOUNT"]
+
+# The new engine also runs bundles, coupons and loyalty, so it is somewhat
+# slower than the legacy monolith (about 1.55 measured); past this ratio the
+# gate fails.
+MAX_SPEED_RATIO = 1.8
+# Allowed slowdown against the previously recorded ratio.
+REGRESSION_TOLERANCE = 1.2
+
+
+def load_legacy():
+    """Imports the legacy modules under their own names without disturbing ours."""
+    saved = {name: sys.modules.pop(name) for name in LEGACY_MODULES if name in sys.modules}
+    sys.path.insert(0, LEGACY_SRC)
+    try:
+        return {name: importlib.import_module(name) for name in LEGACY_MODULES}
+    finally:
+        sys.path.remove(LEGACY_SRC)
+        for name in LEGACY_MODULES:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+
+def load_current():
+    return {name: importlib.import_module(name) for name in LEGACY_MODULES}
+
+
+class DictCatalog:
+    def __init__(self, prices):
+        self.prices = prices
+
+    def unit_price(self, product):
+        return self.prices[product.name]
+
+
+class Scenario:
+    def __init__(self, prices, units, offers, carts):
+        self.prices = prices    # name -> unit price
+        self.units = units      # name -> "EACH" / "KILO"
+        self.offers = offers    # name -> (offer type name, argument)
+        self.carts = carts      # [[(name, quantity)]]
+
+
+def random_scenario(cart_count, seed, product_count=40):
+    rng = random.Random(seed)
+    names = [f"product {i}" for i in range(product_count)]
+    prices = {name: round(rng.uniform(0.2, 9.99), 2) for name in names}
+    units = {name: "KILO" if rng.random() < 0.2 else "EACH" for name in names}
+    offers = {}
+    for name in rng.sample(names, product_count // 2):
+        offer_type = rng.choice(SHARED_OFFER_TYPES)
+        if offer_type == "TEN_PERCENT_DISCOUNT":
+            argument = float(rng.choice([5, 10, 20, 25]))
+        elif offer_type == "THREE_FOR_TWO":
+            argument = 0.0
+        else:
+            argument = round(prices[name] * rng.uniform(1.2, 3.5), 2)
+        offers[name] = (offer_type, argument)
+    carts = []
+    for _ in range(cart_count):
+        lines = []
+        for name in rng.sample(names, rng.randint(1, 12)):
+            if units[name] == "KILO":
+                quantity = round(rng.uniform(0.1, 4.0), 3)
+            else:
+                quantity = float(rng.randint(1, 12))
+            if offers.get(name, ("",))[0] == "TWO_FOR_AMOUNT" and int(quantity) % 2:
+                # Legacy TWO_FOR_AMOUNT divides without flooring, so odd counts
+                # differ by design; only even whole counts are compared.
+                quantity += 1.0
+            lines.append((name, quantity))
+        carts.append(lines)
+    return Scenario(prices, units, offers, carts)
+
+
+class Harness:
+    """One implementation set up for a scenario."""
+
+    def __init__(self, modules, scenario):
+        model_objects = modules["model_objects"]
+        self.modules = modules
+        self.products = {name: model_objects.Product(name, model_objects.ProductUnit[unit])
+                         for name, unit in scenario.units.items()}
+        self.teller = modules["teller"].Teller(DictCatalog(scenario.prices))
+        for name, (offer_type, argument) in scenario.offers.items():
+            self.teller.add_special_offer(model_objects.SpecialOfferType[offer_type], self.products[name], argument)
+        self.carts = [self._cart(lines) for lines in scenario.carts]
+
+    def _cart(self, lines):
+        cart = self.modules["shopping_cart"].ShoppingCart()
+        for name, quantity in lines:
+            cart.add_item_quantity(self.products[name], quantity)
+        return cart
+
+    def check_out_all(self):
+        return [self.teller.checks_out_articles_from(cart) for cart in self.carts]
+
+
+def receipt_summary(receipt):
+    items = [(i.product.name, i.quantity, i.price, i.total_price) for i in receipt.items]
+    discounts = [(d.product.name if d.product else None, d.description, d.discount_amount)
+                 for d in receipt.discounts]
+    return items, discounts, receipt.total_price()
+
+
+def differences(expected, actual, tolerance=1e-9):
+    """Human-readable differences between two receipt summaries."""
+    (expected_items, expected_discounts, expected_total) = expected
+    (actual_items, actual_discounts, actual_total) = actual
+    problems = []
+    if expected_items != actual_items:
+        problems.append(f"items {expected_items} != {actual_items}")
+    if [d[:2] for d in expected_discounts] != [d[:2] for d in actual_discounts]:
+        problems.append(f"discounts {expected_discounts} != {actual_discounts}")
+    elif any(abs(e[2] - a[2]) > tolerance for e, a in zip(expected_discounts, actual_discounts)):
+        problems.append(f"discount amounts {expected_discounts} != {actual_discounts}")
+    if abs(expected_total - actual_total) > tolerance:
+        problems.append(f"total {expected_total} != {actual_total}")
+    return problems
+
+
+def speed_ratio(current, legacy, repeats=7):
+    """Best-of-N time of `current` over best-of-N time of `legacy`, runs interleaved."""
+    best = {current: None, legacy: None}
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            for function in (legacy, current):
+                start = time.perf_counter()
+                function()
+                elapsed = time.perf_counter() - start
+                if best[function] is None or elapsed < best[function]:
+                    best[function] = elapsed
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best[current] / best[legacy]
+
+
+def compare(cart_count=2000, seed=2025):
+    """Returns (mismatches, speed ratio current/legacy) for one random scenario."""
+    scenario = random_scenario(cart_count, seed)
+    legacy = Harness(load_legacy(), scenario)
+    current = Harness(load_current(), scenario)
+
+    mismatches = []
+    for n, (old, new) in enumerate(zip(legacy.check_out_all(), current.check_out_all())):
+        problems = differences(receipt_summary(old), receipt_summary(new))
+        if problems:
+            mismatches.append((n, problems))
+
+    ratio = speed_ratio(current.check_out_all, legacy.check_out_all)
+    return mismatches, ratio
+
+
+def baseline_ratio(path):
+    """Speed ratio of the last run recorded in `path`, or None."""
+    ratio = None
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    ratio = json.loads(line)["speed_ratio"]
+    except FileNotFoundError:
+        pass
+    return ratio
+
+
+def speed_gate(baseline=None):
+    if baseline is None:
+        return MAX_SPEED_RATIO
+    return min(MAX_SPEED_RATIO, baseline * REGRESSION_TOLERANCE)
+
+
+def record(path, cart_count, seed, mismatches, ratio):
+    with open(path, "a") as f:
+        f.write(json.dumps({"date": datetime.datetime.now().isoformat(timespec="seconds"),
+                            "carts": cart_count, "seed": seed, "mismatches": len(mismatches),
+                            "speed_ratio": round(ratio, 3)}) + "\n")
+
+
+def main(args):
+    record_path = None
+    if "--record" in args:
+        i = args.index("--record")
+        record_path = args[i + 1]
+        args = args[:i] + args[i + 2:]
+    cart_count = int(args[0]) if args else 2000
+    seed = int(args[1]) if len(args) > 1 else 2025
+    mismatches, ratio = compare(cart_count, seed)
+    gate = speed_gate(baseline_ratio(record_path) if record_path else None)
+    if record_path:
+        record(record_path, cart_count, seed, mismatches, ratio)
+    for n, problems in mismatches[:10]:
+        print(f"cart {n}: " + "; ".join(problems))
+    print(f"{cart_count} carts, {len(mismatches)} mismatching receipts, "
+          f"speed ratio current/legacy {ratio:.2f} (gate {gate:.2f})")
+    return 1 if mismatches or ratio > gate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,14 +1,17 @@
 from model_objects import Discount, LOYALTY_POINT_VALUE
 
 class LoyaltyService:
-    def apply_reduction(self, receipt, available_points):
+    def redemption_value(self, total, available_points):
         if available_points <= 0:
-            return
-
-        current_total = receipt.total_price()
+            return 0
         max_redemption_value = available_points * LOYALTY_POINT_VALUE
+        return max(min(total, max_redemption_value), 0)
 
-        actual_redemption_value = min(current_total, max_redemption_value)
+    def points_earned_for(self, final_total):
+        return int(final_total)
+
+    def apply_reduction(self, receipt, available_points):
+        actual_redemption_value = self.redemption_value(receipt.total_price(), available_points)
         
         if actual_redemption_value > 0:
             receipt.add_discount(Discount(
@@ -18,6 +21,5 @@ class LoyaltyService:
             ))
 
     def calculate_points_earned(self, receipt):
-        final_total = receipt.total_price()
-        points_earned = int(final_total)
+        points_earned = self.points_earned_for(receipt.total_price())
         receipt.add_loyalty_points(points_earned)
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+Memory soak: runs a simulated day of checkouts through Teller and ReceiptPrinter,
+takes tracemalloc snapshots at intervals and reports which modules and lines
+hold memory and which of them kept growing all day.
+
+python memory_soak.py [checkouts] [snapshots] [seed]
+"""
+
+import datetime
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from collections import namedtuple
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from receipt_printer import ReceiptPrinter
+from shopping_cart import ShoppingCart
+from store_catalog import ShardedCatalog
+from teller import Teller
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OFFER_TYPES = [(SpecialOfferType.THREE_FOR_TWO, 0.0), (SpecialOfferType.TEN_PERCENT_DISCOUNT, 10.0),
+               (SpecialOfferType.TWO_FOR_AMOUNT, 1.5), (SpecialOfferType.FIVE_FOR_AMOUNT, 4.0)]
+COUPON = {'threshold': 3, 'limit': 3, 'percent': 50.0}
+# A line must grow by at least this much over the day to be reported.
+MIN_GROWTH_BYTES = 4096
+
+
+class SoakSample(namedtuple("SoakSample", "checkouts traced peak lines")):
+    """Memory held after `checkouts`; `lines` maps (file, line number) to bytes."""
+
+    def modules(self):
+        sizes = {}
+        for (filename, _), size in self.lines.items():
+            sizes[filename] = sizes.get(filename, 0) + size
+        return sizes
+
+
+class GrowthSite(namedtuple("GrowthSite", "filename lineno sizes")):
+    @property
+    def growth(self):
+        return self.sizes[-1] - self.sizes[0]
+
+
+class SimulatedDay:
+    """A store with a fixed assortment and a seeded stream of customers."""
+
+    def __init__(self, product_count=60, seed=2025):
+        self.rng = random.Random(seed)
+        self.date = datetime.date(2025, 1, 1)
+        catalog = ShardedCatalog()
+        self.products = []
+        for i in range(product_count):
+            product = Product(f"product {i}", ProductUnit.KILO if i % 5 == 0 else ProductUnit.EACH)
+            catalog.add_product(product, round(0.5 + (i % 40) * 0.25, 2))
+            self.products.append(product)
+        self.teller = Teller(catalog)
+        for i, product in enumerate(self.products[::2]):
+            offer_type, argument = OFFER_TYPES[i % len(OFFER_TYPES)]
+            self.teller.add_special_offer(offer_type, product, argument)
+        self.printer = ReceiptPrinter()
+
+    def next_cart(self):
+        rng = self.rng
+        cart = ShoppingCart()
+        for product in rng.sample(self.products, rng.randint(1, 10)):
+            if product.unit == ProductUnit.KILO:
+                # Scales weigh in 50 g steps.
+                cart.add_item_quantity(product, rng.randint(2, 60) * 0.05)
+            else:
+                cart.add_item_quantity(product, float(rng.randint(1, 8)))
+        if rng.random() < 0.1:
+            product = rng.choice(self.products)
+            cart.add_coupon(product, f"SOAK-{product.name}", self.date, self.date,
+                            SpecialOfferType.COUPON_DISCOUNT, COUPON)
+        return cart, rng.choice((0, 0, 0, 25))
+
+    def check_out(self, count):
+        for _ in range(count):
+            cart, points = self.next_cart()
+            receipt = self.teller.checks_out_articles_from(cart, self.date, points)
+            self.printer.print_receipt(receipt)
+
+
+def take_sample(checkouts, filters):
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+    lines = {}
+    for stat in snapshot.statistics("lineno"):
+        frame = stat.traceback[0]
+        lines[(os.path.basename(frame.filename), frame.lineno)] = stat.size
+    traced, peak = tracemalloc.get_traced_memory()
+    return SoakSample(checkouts, traced, peak, lines)
+
+
+def soak(checkouts=20_000, snapshots=10, seed=2025, day=None):
+    """Runs the day and returns one SoakSample per interval, after a warm-up
+    interval that fills lazy imports, caches and the discount memo."""
+    day = day or SimulatedDay(seed=seed)
+    interval = max(1, checkouts // snapshots)
+    filters = [tracemalloc.Filter(True, os.path.join(HERE, "*")),
+               tracemalloc.Filter(False, __file__)]
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        day.check_out(interval)
+        samples = [take_sample(0, filters)]
+        for n in range(1, snapshots + 1):
+            day.check_out(interval)
+            samples.append(take_sample(n * interval, filters))
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return samples
+
+
+def growing_sites(samples, min_growth=MIN_GROWTH_BYTES):
+    """Lines whose retained size grew in every interval and by at least
+    `min_growth` bytes overall, largest growth first. A single step, such as
+    an interpreter-wide table resizing, is not growth."""
+    sites = []
+    for key in samples[-1].lines:
+        sizes = [sample.lines.get(key, 0) for sample in samples]
+        if sizes[-1] - sizes[0] >= min_growth and all(a < b for a, b in zip(sizes, sizes[1:])):
+            sites.append(GrowthSite(key[0], key[1], sizes))
+    sites.sort(key=lambda site: site.growth, reverse=True)
+    return sites
+
+
+def format_report(samples, min_growth=MIN_GROWTH_BYTES, top=10):
+    last = samples[-1]
+    out = [f"{last.checkouts} checkouts, {len(samples)} snapshots",
+           f"traced {last.traced / 1024:.1f} KiB, peak {last.peak / 1024:.1f} KiB", "",
+           "retained by module (first -> last snapshot):"]
+    first_modules = samples[0].modules()
+    for filename, size in sorted(last.modules().items(), key=lambda item: item[1], reverse=True)[:top]:
+        out.append(f"  {filename:<28}{first_modules.get(filename, 0) / 1024:10.1f} KiB -> {size / 1024:.1f} KiB")
+    out.append("")
+    out.append("largest lines:")
+    for (filename, lineno), size in sorted(last.lines.items(), key=lambda item: item[1], reverse=True)[:top]:
+        out.append(f"  {f'{filename}:{lineno}':<28}{size / 1024:10.1f} KiB")
+    out.append("")
+    sites = growing_sites(samples, min_growth)
+    if sites:
+        out.append("monotonic growth:")
+        for site in sites[:top]:
+            out.append(f"  {f'{site.filename}:{site.lineno}':<28}+{site.growth / 1024:.1f} KiB "
+                       f"over {len(site.sizes)} snapshots")
+    else:
+        out.append(f"no line grew in every interval by {min_growth} bytes or more")
+    return "\n".join(out)
+
+
+def main(args):
+    checkouts = int(args[0]) if args else 20_000
+    snapshots = int(args[1]) if len(args) > 1 else 10
+    seed = int(args[2]) if len(args) > 2 else 2025
+    samples = soak(checkouts, snapshots, seed)
+    print(format_report(samples))
+    return 1 if growing_sites(samples) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
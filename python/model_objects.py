@@ -1,6 +1,6 @@
 from enum import Enum
-import math
 from abc import ABC, abstractmethod
+import importlib
 
 LOYALTY_POINT_VALUE = 0.10
 
@@ -11,9 +11,11 @@ class Product:
 
 
 class ProductQuantity:
-    def __init__(self, product, quantity):
+    def __init__(self, product, quantity, line_price=None):
         self.product = product
         self.quantity = quantity
+        # Set when the price was already fixed at the lane, e.g. by a scale.
+        self.line_price = line_price
 
 
 class ProductUnit(Enum):
@@ -27,12 +29,30 @@ class SpecialOfferType(Enum):
     TWO_FOR_AMOUNT = 3
     FIVE_FOR_AMOUNT = 4
     COUPON_DISCOUNT = 5
+    BUY_N_PAY_M = 6
+    N_FOR_AMOUNT = 7
+    RULE = 8
 
 class Discount:
+    # Immutable: DiscountMemo hands the same instance to every receipt with the same line.
+    __slots__ = ("_product", "_description", "_discount_amount")
+
     def __init__(self, product, description, discount_amount):
-        self.product = product
-        self.description = description
-        self.discount_amount = discount_amount
+        self._product = product
+        self._description = description
+        self._discount_amount = discount_amount
+
+    @property
+    def product(self):
+        return self._product
+
+    @property
+    def description(self):
+        return self._description
+
+    @property
+    def discount_amount(self):
+        return self._discount_amount
 
 class Coupon:
     def __init__(self, product, code, start_date, end_date, offer_type, argument):
@@ -53,72 +73,57 @@ class Offer(ABC):
         pass
 
 
-class ThreeForTwoOffer(Offer):
-    def calculate_discount(self, quantity, unit_price):
-        quantity_as_int = int(quantity)
-        if quantity_as_int <= 2:
-            return None
-        discount_amount = quantity * unit_price - (
-            (math.floor(quantity_as_int / 3) * 2 * unit_price) + quantity_as_int % 3 * unit_price)
-        return Discount(self.product, "3 for 2", -discount_amount)
+# Strategies live in offers.py and are only imported once an offer of their
+# type is created; values are "module.ClassName" paths or the classes themselves.
+OFFER_CONSTRUCTORS = {
+    SpecialOfferType.THREE_FOR_TWO: "offers.ThreeForTwoOffer",
+    SpecialOfferType.TEN_PERCENT_DISCOUNT: "offers.TenPercentDiscountOffer",
+    SpecialOfferType.TWO_FOR_AMOUNT: "offers.TwoForAmountOffer",
+    SpecialOfferType.FIVE_FOR_AMOUNT: "offers.FiveForAmountOffer",
+    SpecialOfferType.COUPON_DISCOUNT: "offers.CouponDiscountOffer",
+    SpecialOfferType.BUY_N_PAY_M: "offers.BuyNPayMOffer",
+    SpecialOfferType.N_FOR_AMOUNT: "offers.NForAmountOffer",
+    SpecialOfferType.RULE: "offer_dsl.CompiledOffer",
+}
 
+_LAZY_OFFER_CLASSES = {path.rpartition('.')[2] for path in OFFER_CONSTRUCTORS.values()
+                       if path.startswith("offers.")}
 
-class TenPercentDiscountOffer(Offer):
-    def calculate_discount(self, quantity, unit_price):
-        discount_amount = quantity * unit_price * self.argument / 100.0
-        return Discount(self.product, str(self.argument) + "% off", -discount_amount)
 
+def __getattr__(name):
+    if name in _LAZY_OFFER_CLASSES:
+        return _resolve(f"offers.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-class TwoForAmountOffer(Offer):
-    def calculate_discount(self, quantity, unit_price):
-        quantity_as_int = int(quantity)
-        if quantity_as_int < 2:
-            return None
-        total = self.argument * math.floor(quantity_as_int / 2) + quantity_as_int % 2 * unit_price
-        discount_n = unit_price * quantity - total
-        return Discount(self.product, "2 for " + str(self.argument), -discount_n)
 
+_RESOLVED = {}
+
+
+def _resolve(path):
+    # Resolved once per process: factories are created per checkout, and
+    # re-resolving allocated fresh name strings on every coupon.
+    constructor = _RESOLVED.get(path)
+    if constructor is None:
+        module_name, _, name = path.rpartition('.')
+        constructor = _RESOLVED[path] = getattr(importlib.import_module(module_name), name)
+    return constructor
 
-class FiveForAmountOffer(Offer):
-    def calculate_discount(self, quantity, unit_price):
-        quantity_as_int = int(quantity)
-        if quantity_as_int < 5:
-            return None
-        discount_total = unit_price * quantity - (
-            self.argument * math.floor(quantity_as_int / 5) + quantity_as_int % 5 * unit_price)
-        return Discount(self.product, "5 for " + str(self.argument), -discount_total)
-    
-class CouponDiscountOffer(Offer):    
-    def calculate_discount(self, quantity, unit_price):
-        arg = self.argument
-        threshold = arg['threshold']
-        limit = arg['limit']
-        percent = arg['percent']
 
-        quantity_as_int = int(quantity)
-        
-        if quantity_as_int <= threshold:
-            return None
-            
-        discountable_items = min(quantity_as_int - threshold, limit)
-        discount_amount = discountable_items * unit_price * (percent / 100.0)
-        
-        return Discount(self.product, f"Coupon {percent}% off next {limit} items", -discount_amount)
-    
 class OfferFactory:
+    def __init__(self, constructors=None):
+        self.constructors = dict(OFFER_CONSTRUCTORS if constructors is None else constructors)
+
+    def register(self, offer_type, constructor):
+        self.constructors[offer_type] = constructor
+
     def create(self, offer_type, product, argument):
-        if offer_type == SpecialOfferType.THREE_FOR_TWO:
-            return ThreeForTwoOffer(product, argument)
-        if offer_type == SpecialOfferType.TEN_PERCENT_DISCOUNT:
-            return TenPercentDiscountOffer(product, argument)
-        if offer_type == SpecialOfferType.TWO_FOR_AMOUNT:
-            return TwoForAmountOffer(product, argument)
-        if offer_type == SpecialOfferType.FIVE_FOR_AMOUNT:
-            return FiveForAmountOffer(product, argument)
-        if offer_type == SpecialOfferType.COUPON_DISCOUNT:
-            return CouponDiscountOffer(product, argument)
-        
-        raise ValueError(f"Unknown offer type: {offer_type}")
+        constructor = self.constructors.get(offer_type)
+        if constructor is None:
+            raise ValueError(f"Unknown offer type: {offer_type}")
+        if isinstance(constructor, str):
+            constructor = _resolve(constructor)
+            self.constructors[offer_type] = constructor
+        return constructor(product, argument)
         
 class BundleOffer:
     def __init__(self, bundle_spec, discount_percentage):
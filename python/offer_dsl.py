@@ -0,0 +1,112 @@
+"""
+A small promotion language compiled to specialized Python functions.
+
+    buy 3 pay 2                   every 3 items cost as much as 2
+    5 for 7.49                    every 5 items cost 7.49
+    10.0% off                     percentage off the whole line
+    over 6 get 6 at 50.0% off     coupon: items beyond 6, at most 6 of them
+
+Each rule is compiled once into a code object with its constants inlined; every
+product using the rule gets a function built from that code object, so pricing
+a line is a plain function call with no argument lookups or subclass dispatch.
+"""
+
+import re
+import types
+from functools import lru_cache
+
+from model_objects import Offer, Discount, SpecialOfferType
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+
+_BUY_N_PAY_M = '''
+def calculate_discount(quantity, unit_price):
+    items = quantity // 1
+    if items < {buy}:
+        return None
+    discount_amount = quantity * unit_price - (items // {buy} * ({pay} * unit_price) + items % {buy} * unit_price)
+    return Discount(product, {description!r}, -discount_amount)
+'''
+
+_N_FOR_AMOUNT = '''
+def calculate_discount(quantity, unit_price):
+    items = quantity // 1
+    if items < {count}:
+        return None
+    discount_amount = quantity * unit_price - (items // {count} * {amount!r} + items % {count} * unit_price)
+    return Discount(product, {description!r}, -discount_amount)
+'''
+
+_PERCENT_OFF = '''
+def calculate_discount(quantity, unit_price):
+    return Discount(product, {description!r}, -(quantity * unit_price * {percent!r} / 100.0))
+'''
+
+_COUPON = '''
+def calculate_discount(quantity, unit_price):
+    items = int(quantity)
+    if items <= {threshold}:
+        return None
+    discount_amount = min(items - {threshold}, {limit}) * unit_price * {fraction!r}
+    return Discount(product, {description!r}, -discount_amount)
+'''
+
+_GRAMMAR = [
+    (re.compile(r"buy\s+(\d+)\s+pay\s+(\d+)"),
+     lambda buy, pay: _BUY_N_PAY_M.format(buy=int(buy), pay=int(pay), description=f"{buy} for {pay}")),
+    (re.compile(r"(\d+)\s+for\s+" + _NUMBER),
+     lambda count, amount: _N_FOR_AMOUNT.format(count=int(count), amount=float(amount),
+                                                description=f"{count} for {amount}")),
+    (re.compile(r"over\s+(\d+)\s+get\s+(\d+)\s+at\s+" + _NUMBER + r"%\s+off"),
+     lambda threshold, limit, percent: _COUPON.format(
+         threshold=int(threshold), limit=int(limit), fraction=float(percent) / 100.0,
+         description=f"Coupon {percent}% off next {limit} items")),
+    (re.compile(_NUMBER + r"%\s+off"),
+     lambda percent: _PERCENT_OFF.format(percent=float(percent), description=f"{percent}% off")),
+]
+
+
+@lru_cache(maxsize=1024)
+def compile_rule(rule):
+    """Compiles a rule's text to the code object of its `calculate_discount` function."""
+    text = " ".join(rule.lower().split())
+    for pattern, generate in _GRAMMAR:
+        match = pattern.fullmatch(text)
+        if match:
+            module = compile(generate(*match.groups()), f"<offer rule {text!r}>", "exec")
+            return next(c for c in module.co_consts if isinstance(c, types.CodeType))
+    raise ValueError(f"Cannot parse offer rule: {rule!r}")
+
+
+def compile_offer_function(rule, product):
+    return types.FunctionType(compile_rule(rule), {"Discount": Discount, "product": product, "min": min})
+
+
+def rule_for(offer_type, argument):
+    """The DSL spelling of one of the classic offer types."""
+    if offer_type == SpecialOfferType.THREE_FOR_TWO:
+        return "buy 3 pay 2"
+    if offer_type == SpecialOfferType.BUY_N_PAY_M:
+        return f"buy {argument['buy']} pay {argument['pay']}"
+    if offer_type == SpecialOfferType.TEN_PERCENT_DISCOUNT:
+        return f"{argument}% off"
+    if offer_type == SpecialOfferType.TWO_FOR_AMOUNT:
+        return f"2 for {argument}"
+    if offer_type == SpecialOfferType.FIVE_FOR_AMOUNT:
+        return f"5 for {argument}"
+    if offer_type == SpecialOfferType.N_FOR_AMOUNT:
+        return f"{argument['count']} for {argument['amount']}"
+    if offer_type == SpecialOfferType.COUPON_DISCOUNT:
+        return f"over {argument['threshold']} get {argument['limit']} at {argument['percent']}% off"
+    raise ValueError(f"No rule for offer type: {offer_type}")
+
+
+class CompiledOffer(Offer):
+    def __init__(self, product, argument):
+        super().__init__(product, argument)
+        # The instance attribute shadows the method below, so calls go straight
+        # to the compiled function.
+        self.calculate_discount = compile_offer_function(argument, product)
+
+    def calculate_discount(self, quantity, unit_price):
+        return self.calculate_discount(quantity, unit_price)
@@ -0,0 +1,36 @@
+"""
+Compares the per-call cost of the offer classes with their compiled DSL rules.
+
+python offer_dsl_benchmark.py [calls]
+"""
+
+import sys
+import timeit
+
+from model_objects import Product, ProductUnit, SpecialOfferType, OfferFactory
+from offer_dsl import CompiledOffer, rule_for
+
+CASES = [
+    (SpecialOfferType.THREE_FOR_TWO, 0.0, 7.0),
+    (SpecialOfferType.TEN_PERCENT_DISCOUNT, 10.0, 2.5),
+    (SpecialOfferType.TWO_FOR_AMOUNT, 0.99, 3.0),
+    (SpecialOfferType.FIVE_FOR_AMOUNT, 7.49, 11.0),
+    (SpecialOfferType.COUPON_DISCOUNT, {'threshold': 6, 'limit': 6, 'percent': 50.0}, 12.0),
+]
+
+
+def main(args):
+    calls = int(args[0]) if args else 200_000
+    product = Product("toothbrush", ProductUnit.EACH)
+    factory = OfferFactory()
+    print(f"{'offer':<22} {'class ns':>9} {'rule ns':>9} {'speedup':>8}")
+    for offer_type, argument, quantity in CASES:
+        classic = factory.create(offer_type, product, argument)
+        compiled = CompiledOffer(product, rule_for(offer_type, argument))
+        classic_ns = timeit.timeit(lambda: classic.calculate_discount(quantity, 0.99), number=calls) / calls * 1e9
+        compiled_ns = timeit.timeit(lambda: compiled.calculate_discount(quantity, 0.99), number=calls) / calls * 1e9
+        print(f"{offer_type.name:<22} {classic_ns:9.0f} {compiled_ns:9.0f} {classic_ns / compiled_ns:7.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,214 @@
+import csv
+import os
+import logging
+import threading
+
+from model_objects import BundleOffer, SpecialOfferType
+
+log = logging.getLogger(__name__)
+
+BUNDLE = "BUNDLE"
+COUPON = "COUPON_DISCOUNT"
+STANDARD = "OFFER"
+
+
+def parse_argument(arg_str):
+    if "=" in arg_str:
+        result = {}
+        pairs = arg_str.split(';')
+        for pair in pairs:
+            key, value = pair.split('=')
+            try:
+                if "." in value:
+                    result[key] = float(value)
+                else:
+                    result[key] = int(value)
+            except ValueError:
+                result[key] = value
+        return result
+    else:
+        return float(arg_str)
+
+
+class FeedChanges:
+    def __init__(self, added=0, removed=0, changed=0, rejected=(), waiting=0):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.rejected = list(rejected)  # [(line, error message)]
+        self.waiting = waiting          # rows for products not in the catalog yet
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return (f"FeedChanges(added={self.added}, removed={self.removed}, changed={self.changed}, "
+                f"rejected={len(self.rejected)}, waiting={self.waiting})")
+
+
+class OfferFeed:
+    """Keeps a Teller's offers and bundles in sync with an offers.csv feed.
+
+    Reloads diff the raw rows against the previous load, so only added, removed
+    and changed rows are parsed, and the Teller publishes all of them as one new
+    rules snapshot. Rows are keyed by product name(s) and offer kind; coupon rows
+    belong to a basket, not the Teller, and are ignored here.
+
+    Malformed rows are reported in FeedChanges.rejected and skipped until the
+    file changes; while an edited row is rejected, the row it replaced stays
+    live. Rows for products missing from the catalog are retried on every poll
+    until the products appear.
+    """
+
+    def __init__(self, path, catalog, teller):
+        self.path = path
+        self.catalog = catalog
+        self.teller = teller
+        self._header = []
+        self._file_lines = set()  # rows of the last file read
+        self._lines = set()       # live rows, including ones held while their replacement is rejected
+        self._rejected = {}       # malformed row -> key, skipped while the file keeps them
+        self._waiting = set()     # rows for products not in the catalog yet
+        self._bundles = {}
+        self._stat = None
+
+    def poll(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return FeedChanges()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._stat:
+            if self._waiting:
+                return self.apply_lines(self._header, self._file_lines)
+            return FeedChanges()
+        changes = self.reload()
+        # Only after a successful apply, so a failed reload is retried next poll.
+        self._stat = signature
+        return changes
+
+    def watch(self, interval=1.0, stop=None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                changes = self.poll()
+            except Exception:
+                log.exception("Offer feed reload failed; retrying in %.1fs", interval)
+            else:
+                for line, error in changes.rejected:
+                    log.warning("Rejected offer feed row %r: %s", line, error)
+            stop.wait(interval)
+
+    def reload(self):
+        with open(self.path, "r", newline="") as f:
+            lines = f.read().splitlines()
+        return self.apply_lines(lines[:1], {line for line in lines[1:] if line.strip()})
+
+    def apply_lines(self, header, lines):
+        self._header = header
+        self._file_lines = lines
+        self._rejected = {line: key for line, key in self._rejected.items() if line in lines}
+        removed_lines = self._lines - lines
+        added_lines = lines - self._lines - self._rejected.keys()
+        if not removed_lines and not added_lines:
+            return FeedChanges()
+
+        removed = {self._key(row): (line, row) for line, row in self._parse(header, removed_lines)}
+        added = {self._key(row): (line, row) for line, row in self._parse(header, added_lines)}
+        held_keys = set(self._rejected.values())
+
+        offers = {}
+        removed_offers = []
+        bundle_offers = []
+        removed_bundle_offers = []
+        kept = set()
+        gone = 0
+        for key in removed.keys() - added.keys():
+            if key in held_keys:
+                kept.add(removed[key][0])
+            else:
+                self._unload(key, removed_offers, removed_bundle_offers)
+                gone += 1
+        new_count = changed = 0
+        rejected = []
+        waiting = set()
+        for key, (line, row) in added.items():
+            try:
+                loaded = self._load(key, row)
+            except (ValueError, TypeError, KeyError) as e:
+                rejected.append((line, f"{type(e).__name__}: {e}"))
+                self._rejected[line] = key
+                if key in removed:
+                    kept.add(removed[key][0])
+                continue
+            if key in removed:
+                self._unload(key, removed_offers, removed_bundle_offers)
+            if loaded is None:
+                waiting.add(line)
+                gone += key in removed
+                continue
+            self._apply(key, loaded, offers, bundle_offers)
+            if key in removed:
+                changed += 1
+            else:
+                new_count += 1
+
+        if offers or removed_offers or bundle_offers or removed_bundle_offers:
+            self.teller.update_rules(lambda rules: rules.with_changes(
+                offers, removed_offers, bundle_offers, removed_bundle_offers))
+        self._waiting = waiting
+        self._lines = (lines - self._rejected.keys() - waiting) | kept
+        return FeedChanges(new_count, gone, changed, rejected, len(waiting))
+
+    def _parse(self, header, lines):
+        if not lines or not header:
+            return []
+        lines = sorted(lines)
+        return list(zip(lines, csv.DictReader(header + lines)))
+
+    def _key(self, row):
+        kind = row['offer'] if row['offer'] in (BUNDLE, COUPON) else STANDARD
+        return kind, row['name']
+
+    def _unload(self, key, removed_offers, removed_bundle_offers):
+        kind, names = key
+        if kind == BUNDLE:
+            bundle = self._bundles.pop(names, None)
+            if bundle is not None:
+                removed_bundle_offers.append(bundle)
+        elif kind == STANDARD and names in self.catalog.products:
+            removed_offers.append(self.catalog.products[names])
+
+    def _load(self, key, row):
+        """Builds the row's offer or bundle, or returns None while it waits for a
+        product to reach the catalog. Raises on malformed rows."""
+        kind, names = key
+        offer_name = row['offer']
+        if kind == BUNDLE:
+            bundle_spec = {}
+            for name in names.split('|'):
+                if name not in self.catalog.products:
+                    return None
+                bundle_spec[self.catalog.products[name]] = 1.0
+            return BundleOffer(bundle_spec, parse_argument(row['argument']))
+        if kind == STANDARD:
+            if offer_name not in SpecialOfferType.__members__:
+                raise ValueError(f"Unknown offer type: {offer_name}")
+            if names not in self.catalog.products:
+                return None
+            product = self.catalog.products[names]
+            offer_type = SpecialOfferType[offer_name]
+            argument = row['argument']
+            if offer_type != SpecialOfferType.RULE:
+                argument = parse_argument(argument)
+            return product, self.teller.offer_factory.create(offer_type, product, argument)
+        return kind
+
+    def _apply(self, key, loaded, offers, bundle_offers):
+        kind, names = key
+        if kind == BUNDLE:
+            self._bundles[names] = loaded
+            bundle_offers.append(loaded)
+        elif kind == STANDARD:
+            product, offer = loaded
+            offers[product] = offer
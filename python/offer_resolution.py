@@ -0,0 +1,79 @@
+class ProductRules:
+    """Every rule that can touch one product, in pipeline priority order."""
+
+    __slots__ = ("bundle_offers", "offer")
+
+    def __init__(self, bundle_offers=(), offer=None):
+        self.bundle_offers = bundle_offers
+        self.offer = offer
+
+
+class ResolutionTable:
+    """Per-product index of bundles and standard offers, built once per rules snapshot.
+
+    Products missing from the table have no standing promotion, so checkout can
+    skip the discount engine for them. Coupons arrive with the cart and are
+    resolved per checkout.
+    """
+
+    def __init__(self, entries, bundle_offers):
+        self._entries = entries
+        self._bundle_offers = bundle_offers
+        self._bundle_rank = None
+
+    @classmethod
+    def build(cls, offers, bundle_offers):
+        bundles_by_product = {}
+        for bundle in bundle_offers:
+            for product in bundle.bundle_spec:
+                bundles_by_product.setdefault(product, []).append(bundle)
+        entries = {}
+        for product in bundles_by_product.keys() | offers.keys():
+            entries[product] = ProductRules(tuple(bundles_by_product.get(product, ())), offers.get(product))
+        return cls(entries, bundle_offers)
+
+    def derive(self, offers, bundle_offers, changed_products, added_bundles, removed_bundles):
+        """Table for the next snapshot, rebuilding only the entries of touched products."""
+        removed_ids = {id(b) for b in removed_bundles}
+        touched = set(changed_products)
+        for bundle in added_bundles:
+            touched.update(bundle.bundle_spec)
+        for bundle in removed_bundles:
+            touched.update(bundle.bundle_spec)
+
+        entries = dict(self._entries)
+        for product in touched:
+            previous = entries.get(product)
+            product_bundles = () if previous is None else previous.bundle_offers
+            product_bundles = tuple(b for b in product_bundles if id(b) not in removed_ids)
+            product_bundles += tuple(b for b in added_bundles if product in b.bundle_spec)
+            offer = offers.get(product)
+            if product_bundles or offer is not None:
+                entries[product] = ProductRules(product_bundles, offer)
+            else:
+                entries.pop(product, None)
+        return ResolutionTable(entries, bundle_offers)
+
+    def __contains__(self, product):
+        return product in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, product):
+        return self._entries.get(product)
+
+    def candidate_bundles(self, products):
+        """Bundles touching any of `products`, in the snapshot's bundle order."""
+        candidates = {}
+        for product in products:
+            entry = self._entries.get(product)
+            if entry is not None:
+                for bundle in entry.bundle_offers:
+                    candidates[id(bundle)] = bundle
+        if len(candidates) <= 1:
+            return list(candidates.values())
+        if self._bundle_rank is None:
+            self._bundle_rank = {id(b): i for i, b in enumerate(self._bundle_offers)}
+        rank = self._bundle_rank
+        return sorted(candidates.values(), key=lambda b: rank[id(b)])
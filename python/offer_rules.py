@@ -0,0 +1,65 @@
+from types import MappingProxyType
+
+from offer_resolution import ResolutionTable
+
+
+class OfferRules:
+    """Immutable snapshot of the offers a Teller prices with.
+
+    Every change returns a new snapshot, so a checkout that pinned one keeps a
+    consistent view while promotions are updated concurrently.
+    """
+
+    def __init__(self, offers=None, bundle_offers=(), version=0, resolution_table=None):
+        self._offers = dict(offers or {})
+        self._bundle_offers = tuple(bundle_offers)
+        self._version = version
+        self._resolution_table = resolution_table
+
+    @property
+    def offers(self):
+        return MappingProxyType(self._offers)
+
+    @property
+    def bundle_offers(self):
+        return self._bundle_offers
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def resolution_table(self):
+        if self._resolution_table is None:
+            self._resolution_table = ResolutionTable.build(self._offers, self._bundle_offers)
+        return self._resolution_table
+
+    def with_changes(self, offers=None, removed_offers=(), bundle_offers=(), removed_bundle_offers=()):
+        """Apply a whole batch of changes with a single copy of the rule tables."""
+        offers = offers or {}
+        new_offers = dict(self._offers)
+        for product in removed_offers:
+            new_offers.pop(product, None)
+        new_offers.update(offers)
+        removed_ids = {id(b) for b in removed_bundle_offers}
+        new_bundle_offers = tuple(b for b in self._bundle_offers if id(b) not in removed_ids)
+        new_bundle_offers += tuple(bundle_offers)
+
+        resolution_table = None
+        if self._resolution_table is not None:
+            resolution_table = self._resolution_table.derive(
+                new_offers, new_bundle_offers, list(removed_offers) + list(offers),
+                bundle_offers, removed_bundle_offers)
+        return OfferRules(new_offers, new_bundle_offers, self._version + 1, resolution_table)
+
+    def with_offer(self, product, offer):
+        return self.with_changes(offers={product: offer})
+
+    def without_offer(self, product):
+        return self.with_changes(removed_offers=(product,))
+
+    def with_bundle_offer(self, bundle_offer):
+        return self.with_changes(bundle_offers=(bundle_offer,))
+
+    def without_bundle_offer(self, bundle_offer):
+        return self.with_changes(removed_bundle_offers=(bundle_offer,))
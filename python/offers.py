@@ -0,0 +1,75 @@
+import sys
+
+from model_objects import Offer, Discount
+from group_pricing import groups_of, buy_n_pay_m_discount, n_for_amount_discount
+from coupon_tiers import TieredCoupon
+
+
+class BuyNPayMOffer(Offer):
+    def __init__(self, product, argument, buy=None, pay=None):
+        super().__init__(product, argument)
+        self.buy = buy if buy is not None else int(argument['buy'])
+        self.pay = pay if pay is not None else int(argument['pay'])
+        self.description = sys.intern(f"{self.buy} for {self.pay}")
+
+    def calculate_discount(self, quantity, unit_price):
+        if groups_of(quantity, self.buy) < 1:
+            return None
+        discount_amount = buy_n_pay_m_discount(quantity, unit_price, self.buy, self.pay)
+        return Discount(self.product, self.description, -discount_amount)
+
+
+class NForAmountOffer(Offer):
+    def __init__(self, product, argument, count=None):
+        if count is None:
+            count = int(argument['count'])
+            argument = argument['amount']
+        super().__init__(product, argument)
+        self.count = count
+        self.description = sys.intern(f"{self.count} for " + str(self.argument))
+
+    def calculate_discount(self, quantity, unit_price):
+        if groups_of(quantity, self.count) < 1:
+            return None
+        discount_amount = n_for_amount_discount(quantity, unit_price, self.count, self.argument)
+        return Discount(self.product, self.description, -discount_amount)
+
+
+class ThreeForTwoOffer(BuyNPayMOffer):
+    def __init__(self, product, argument):
+        super().__init__(product, argument, buy=3, pay=2)
+
+
+class TenPercentDiscountOffer(Offer):
+    def __init__(self, product, argument):
+        super().__init__(product, argument)
+        self.description = sys.intern(str(self.argument) + "% off")
+
+    def calculate_discount(self, quantity, unit_price):
+        discount_amount = quantity * unit_price * self.argument / 100.0
+        return Discount(self.product, self.description, -discount_amount)
+
+
+class TwoForAmountOffer(NForAmountOffer):
+    def __init__(self, product, argument):
+        super().__init__(product, argument, count=2)
+
+
+class FiveForAmountOffer(NForAmountOffer):
+    def __init__(self, product, argument):
+        super().__init__(product, argument, count=5)
+    
+class CouponDiscountOffer(Offer):    
+    def __init__(self, product, argument):
+        super().__init__(product, argument)
+        self.tiers = TieredCoupon.from_argument(argument)
+
+    def calculate_discount(self, quantity, unit_price):
+        tier = self.tiers.best_tier(int(quantity))
+        if tier is None:
+            return None
+        return Discount(self.product, tier.description, -tier.savings(int(quantity), unit_price))
+
+    def items_consumed(self, quantity):
+        tier = self.tiers.best_tier(int(quantity))
+        return min(quantity, tier.max_items)
@@ -0,0 +1,134 @@
+"""
+Side-effect-free pricing core.
+
+price_cart() turns a cart, a catalog, a rules snapshot and a date into an
+immutable PricedBasket. Loyalty redemption is a cheap final step on top of it,
+so previews, split tenders and "what if I redeem N points" queries can reuse
+one priced basket instead of pricing the cart again.
+"""
+
+from bisect import bisect_right
+from collections import namedtuple
+
+from discount_calculator import DiscountCalculator
+from loyalty_service import LoyaltyService
+from model_objects import Discount
+from receipt import Receipt
+
+LoyaltyOutcome = namedtuple("LoyaltyOutcome", "redemption final_total points_earned")
+
+_loyalty_service = LoyaltyService()
+
+
+class PricedBasket(namedtuple("PricedBasket", "items discounts subtotal total")):
+    """items are (product, quantity, unit price, line price) tuples; total is before loyalty."""
+
+    __slots__ = ()
+
+    def loyalty_outcome(self, available_points, loyalty_service=_loyalty_service):
+        redemption = loyalty_service.redemption_value(self.total, available_points)
+        final_total = self.total - redemption if redemption > 0 else self.total
+        return LoyaltyOutcome(redemption, final_total, loyalty_service.points_earned_for(final_total))
+
+    def loyalty_curve(self, loyalty_service=_loyalty_service):
+        return LoyaltyCurve(self.total, loyalty_service)
+
+    def to_receipt(self, available_points=0, loyalty_service=_loyalty_service):
+        receipt = Receipt()
+        for item in self.items:
+            receipt.add_product(*item)
+        for discount in self.discounts:
+            receipt.add_discount(discount)
+        # The priced total already is the receipt total, so loyalty needs no re-summing.
+        outcome = self.loyalty_outcome(available_points, loyalty_service)
+        if outcome.redemption > 0:
+            receipt.add_discount(Discount(None, "Loyalty Discount", -outcome.redemption))
+        receipt.add_loyalty_points(outcome.points_earned)
+        return receipt
+
+
+class LoyaltyCurve:
+    """Loyalty outcome of one priced total for any number of points redeemed.
+
+    Redemption grows linearly with points until it covers the total, while
+    points earned only step down each time the final total drops below a whole
+    amount. The steps are found once, so each query is a binary search.
+    """
+
+    def __init__(self, total, loyalty_service=_loyalty_service):
+        self.total = total
+        self.loyalty_service = loyalty_service
+        # breakpoints[i] is the fewest points that earn earned[i].
+        self.breakpoints = [0]
+        self.earned = [self._points_earned(0)]
+        self.max_points = self._fewest_points(lambda points: loyalty_service.redemption_value(total, points) >= total)
+        floor = self._points_earned(self.max_points)
+        while self.earned[-1] > floor:
+            target = self.earned[-1] - 1
+            points = self._fewest_points(lambda points: self._points_earned(points) <= target,
+                                         self.breakpoints[-1])
+            self.breakpoints.append(points)
+            self.earned.append(self._points_earned(points))
+
+    def _points_earned(self, points):
+        redemption = self.loyalty_service.redemption_value(self.total, points)
+        final_total = self.total - redemption if redemption > 0 else self.total
+        return self.loyalty_service.points_earned_for(final_total)
+
+    def _fewest_points(self, reached, start=0):
+        # Whole points are redeemed, and every predicate used here only flips
+        # once as points grow, so a galloping search from `start` finds the edge.
+        if self.total <= 0 or reached(start):
+            return start
+        low, step = start, 1
+        while not reached(low + step):
+            low, step = low + step, step * 2
+        high = low + step
+        while high - low > 1:
+            middle = (low + high) // 2
+            if reached(middle):
+                high = middle
+            else:
+                low = middle
+        return high
+
+    def outcome(self, points):
+        redemption = self.loyalty_service.redemption_value(self.total, points)
+        final_total = self.total - redemption if redemption > 0 else self.total
+        step = bisect_right(self.breakpoints, max(points, 0)) - 1
+        return LoyaltyOutcome(redemption, final_total, self.earned[step])
+
+    def __len__(self):
+        return len(self.breakpoints)
+
+
+def price_items(catalog, cart):
+    items = []
+    for item in cart.items:
+        unit_price = catalog.unit_price(item.product)
+        line_price = item.quantity * unit_price if item.line_price is None else item.line_price
+        items.append((item.product, item.quantity, unit_price, line_price))
+    return tuple(items)
+
+
+def cart_calculator(catalog, rules, profiler=None, trace=None, memo=None):
+    """A DiscountCalculator pinned to one rules snapshot; it holds no per-cart
+    state, so a batch of carts can share it."""
+    return DiscountCalculator(
+        catalog, rules.offers, rules.bundle_offers, rules.resolution_table, profiler, trace, memo)
+
+
+def price_cart(catalog, rules, cart, current_date, profiler=None, trace=None, memo=None, calculator=None):
+    items = price_items(catalog, cart)
+    if calculator is None:
+        calculator = cart_calculator(catalog, rules, profiler, trace, memo)
+    discounts = tuple(calculator.calculate_discounts(cart.product_quantities, cart.coupons, current_date))
+
+    # Same summation order as Receipt.total_price, so totals match to the last bit.
+    subtotal = 0
+    for item in items:
+        subtotal += item[3]
+    total = subtotal
+    for discount in discounts:
+        total += discount.discount_amount
+    return PricedBasket(items, discounts, subtotal, total)
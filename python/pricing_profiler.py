@@ -0,0 +1,75 @@
+import threading
+import time
+
+BUNDLE = "bundle"
+COUPON = "coupon"
+OFFER = "offer"
+
+
+class RuleStats:
+    __slots__ = ("kind", "name", "evaluations", "applications", "savings", "cpu_ns")
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.evaluations = 0
+        self.applications = 0
+        self.savings = 0.0
+        self.cpu_ns = 0
+
+
+class RuleProfiler:
+    """Per-rule evaluation counts, hit counts, savings granted and CPU time.
+
+    Bundles are keyed by their description, coupons by code and standard offers
+    by product name. Attach one to a Teller (or DiscountCalculator) to start
+    collecting; without one the calculator does no bookkeeping at all. A Teller
+    shared by several lanes can share one profiler: updates are locked.
+    """
+
+    clock = staticmethod(time.thread_time_ns)
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def evaluated(self, kind, name, started_ns):
+        elapsed = self.clock() - started_ns
+        with self._lock:
+            stats = self._entry(kind, name)
+            stats.evaluations += 1
+            stats.cpu_ns += elapsed
+
+    def applied(self, kind, name, savings):
+        with self._lock:
+            stats = self._entry(kind, name)
+            stats.applications += 1
+            stats.savings += savings
+
+    def stats(self, kind, name):
+        return self._stats.get((kind, name))
+
+    def rows(self, sort_by="cpu_ns"):
+        with self._lock:
+            stats = list(self._stats.values())
+        return sorted(stats, key=lambda s: getattr(s, sort_by), reverse=True)
+
+    def never_applied(self):
+        return [s for s in self.rows() if s.applications == 0]
+
+    def format_table(self, sort_by="cpu_ns"):
+        lines = [f"{'kind':<7} {'rule':<40} {'evals':>8} {'applied':>8} {'savings':>10} {'cpu ms':>9}"]
+        for s in self.rows(sort_by):
+            lines.append(f"{s.kind:<7} {s.name[:40]:<40} {s.evaluations:>8} {s.applications:>8} "
+                         f"{s.savings:>10.2f} {s.cpu_ns / 1e6:>9.3f}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def _entry(self, kind, name):
+        stats = self._stats.get((kind, name))
+        if stats is None:
+            stats = self._stats[(kind, name)] = RuleStats(kind, name)
+        return stats
@@ -0,0 +1,307 @@
+import os
+import struct
+import threading
+import zlib
+
+MAGIC = b"RCPJ"
+FORMAT_VERSION = 2
+
+_FILE_HEADER = struct.Struct("<4sH")
+# Version 2 headers also carry the highest sequence handed out before the
+# file's first record, so compaction never lets sequences start over.
+_SEQUENCE_FLOOR = struct.Struct("<Q")
+_RECORD_HEADER = struct.Struct("<II")   # payload length, crc32 of payload
+_RECORD_FIXED = struct.Struct("<QdqHH")  # sequence, total, loyalty points, items, discounts
+_ITEM = struct.Struct("<ddd")           # quantity, price, total price
+_AMOUNT = struct.Struct("<d")
+_TEXT_LENGTH = struct.Struct("<H")
+
+
+class JournalRecord:
+    __slots__ = ("sequence", "items", "discounts", "total", "loyalty_points")
+
+    def __init__(self, sequence, items, discounts, total, loyalty_points):
+        self.sequence = sequence
+        self.items = items            # [(product name, quantity, price, total price)]
+        self.discounts = discounts    # [(product name or None, description, amount)]
+        self.total = total
+        self.loyalty_points = loyalty_points
+
+
+def _pack_text(parts, text):
+    data = text.encode("utf-8")
+    parts.append(_TEXT_LENGTH.pack(len(data)))
+    parts.append(data)
+
+
+def _unpack_text(payload, offset):
+    (length,) = _TEXT_LENGTH.unpack_from(payload, offset)
+    offset += _TEXT_LENGTH.size
+    return payload[offset:offset + length].decode("utf-8"), offset + length
+
+
+def encode_receipt(sequence, receipt):
+    items = receipt.items
+    discounts = receipt.discounts
+    parts = [_RECORD_FIXED.pack(sequence, receipt.total_price(), receipt.loyalty_points,
+                                len(items), len(discounts))]
+    for item in items:
+        _pack_text(parts, item.product.name)
+        parts.append(_ITEM.pack(item.quantity, item.price, item.total_price))
+    for discount in discounts:
+        # An empty name stands for a receipt-level discount (bundles, loyalty).
+        _pack_text(parts, discount.product.name if discount.product else "")
+        _pack_text(parts, discount.description)
+        parts.append(_AMOUNT.pack(discount.discount_amount))
+    payload = b"".join(parts)
+    return _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_record(payload):
+    sequence, total, loyalty_points, item_count, discount_count = _RECORD_FIXED.unpack_from(payload, 0)
+    offset = _RECORD_FIXED.size
+    items = []
+    for _ in range(item_count):
+        name, offset = _unpack_text(payload, offset)
+        quantity, price, total_price = _ITEM.unpack_from(payload, offset)
+        offset += _ITEM.size
+        items.append((name, quantity, price, total_price))
+    discounts = []
+    for _ in range(discount_count):
+        name, offset = _unpack_text(payload, offset)
+        description, offset = _unpack_text(payload, offset)
+        (amount,) = _AMOUNT.unpack_from(payload, offset)
+        offset += _AMOUNT.size
+        discounts.append((name or None, description, amount))
+    return JournalRecord(sequence, items, discounts, total, loyalty_points)
+
+
+def _write_header(f, sequence_floor):
+    f.write(_FILE_HEADER.pack(MAGIC, FORMAT_VERSION))
+    f.write(_SEQUENCE_FLOOR.pack(sequence_floor))
+
+
+def _read_header(f):
+    """Returns (sequence floor, header size), or None when a crash during
+    creation left the header incomplete."""
+    header = f.read(_FILE_HEADER.size)
+    if len(header) < _FILE_HEADER.size:
+        if not MAGIC.startswith(header[:len(MAGIC)]):
+            raise ValueError(f"Not a receipt journal: {f.name}")
+        return None
+    magic, version = _FILE_HEADER.unpack(header)
+    if magic != MAGIC or version not in (1, FORMAT_VERSION):
+        raise ValueError(f"Not a receipt journal (version {FORMAT_VERSION}): {f.name}")
+    if version == 1:
+        return 0, _FILE_HEADER.size
+    floor = f.read(_SEQUENCE_FLOOR.size)
+    if len(floor) < _SEQUENCE_FLOOR.size:
+        return None
+    return _SEQUENCE_FLOOR.unpack(floor)[0], _FILE_HEADER.size + _SEQUENCE_FLOOR.size
+
+
+def _scan(f, offset):
+    """Yields (record end offset, payload) for every intact record after the
+    header; stops at a torn tail."""
+    while True:
+        header = f.read(_RECORD_HEADER.size)
+        if len(header) < _RECORD_HEADER.size:
+            return
+        length, crc = _RECORD_HEADER.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return
+        offset += _RECORD_HEADER.size + length
+        yield offset, payload
+
+
+def _sequence(payload):
+    return _RECORD_FIXED.unpack_from(payload, 0)[0]
+
+
+def read_journal(path):
+    """Yields the committed records of a journal, ignoring a torn or corrupt tail."""
+    with open(path, "rb") as f:
+        header = _read_header(f)
+        if header is None:
+            return
+        for _, payload in _scan(f, header[1]):
+            yield decode_record(payload)
+
+
+def recover(path):
+    """Truncates a torn tail left by a crash, and rewrites a torn header.
+    Returns (records kept, last sequence handed out)."""
+    count = 0
+    with open(path, "r+b") as f:
+        header = _read_header(f)
+        if header is None:
+            f.seek(0)
+            f.truncate()
+            _write_header(f, 0)
+            f.flush()
+            os.fsync(f.fileno())
+            return 0, 0
+        last_sequence, end = header
+        for end, payload in _scan(f, end):
+            count += 1
+            last_sequence = max(last_sequence, _sequence(payload))
+        if os.fstat(f.fileno()).st_size > end:
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+    return count, last_sequence
+
+
+def compact(source, destination, keep_from_sequence=0):
+    """Rewrites `source` into `destination`, dropping records below `keep_from_sequence`
+    (e.g. already exported to the database) and any torn tail. Returns records kept.
+    The compacted header remembers the last sequence, so numbering carries on."""
+    kept = 0
+    temporary = destination + ".tmp"
+    with open(source, "rb") as src, open(temporary, "wb") as dst:
+        header = _read_header(src)
+        last_sequence = header[0] if header else 0
+        _write_header(dst, last_sequence)
+        if header is not None:
+            for _, payload in _scan(src, header[1]):
+                sequence = _sequence(payload)
+                last_sequence = max(last_sequence, sequence)
+                if sequence >= keep_from_sequence:
+                    dst.write(_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+                    dst.write(payload)
+                    kept += 1
+        dst.seek(0)
+        _write_header(dst, last_sequence)
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.replace(temporary, destination)
+    _fsync_directory(destination)
+    return kept
+
+
+def _fsync_directory(path):
+    # Makes a rename or a newly created file survive a power loss.
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+class ReceiptJournal:
+    """Append-only receipt log with group commit.
+
+    Appenders reserve a sequence, encode their record outside the lock and
+    hand it to a background committer. The committer sleeps while nothing is
+    queued; `commit_interval` seconds after the first record arrives, or as
+    soon as `commit_records` are waiting, it writes and fsyncs the records in
+    sequence order. `append` returns once the record is durable, so one fsync
+    covers a whole batch of lanes.
+    """
+
+    def __init__(self, path, commit_interval=0.005, commit_records=64):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.commit_records = commit_records
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            _, self._appended = recover(path)
+            self._file = open(path, "ab")
+        else:
+            self._appended = 0
+            self._file = open(path, "wb")
+            _write_header(self._file, 0)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            _fsync_directory(path)
+        self._durable = self._appended
+        self._written = self._appended
+        self._pending = {}  # sequence -> encoded record, None if encoding failed
+        self._closed = False
+        self._error = None
+        self._condition = threading.Condition()
+        self._committer = threading.Thread(target=self._run, name="receipt-journal", daemon=True)
+        self._committer.start()
+
+    @property
+    def last_sequence(self):
+        return self._appended
+
+    def append(self, receipt, wait=True):
+        with self._condition:
+            if self._closed:
+                raise ValueError("Journal is closed")
+            self._appended += 1
+            sequence = self._appended
+        record = None
+        try:
+            record = encode_receipt(sequence, receipt)
+        finally:
+            # Even a failed record fills its slot, so later ones aren't held up.
+            with self._condition:
+                self._pending[sequence] = record
+                if sequence == self._written + 1 or len(self._pending) >= self.commit_records:
+                    self._condition.notify_all()
+        with self._condition:
+            if wait:
+                self._wait_durable(sequence)
+        return sequence
+
+    def sync(self):
+        with self._condition:
+            self._condition.notify_all()
+            self._wait_durable(self._appended)
+
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._committer.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _wait_durable(self, sequence):
+        while self._durable < sequence:
+            if self._error is not None:
+                raise self._error
+            self._condition.wait()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._written + 1 in self._pending or
+                    (self._closed and self._written == self._appended))
+                self._condition.wait_for(
+                    lambda: self._closed or len(self._pending) >= self.commit_records,
+                    timeout=self.commit_interval)
+                batch = []
+                while self._written + 1 in self._pending:
+                    self._written += 1
+                    record = self._pending.pop(self._written)
+                    if record is not None:
+                        batch.append(record)
+                batch_end = self._written
+                closing = self._closed and self._written == self._appended
+            if batch_end > self._durable:
+                try:
+                    self._file.write(b"".join(batch))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                except OSError as e:
+                    with self._condition:
+                        self._error = e
+                        self._condition.notify_all()
+                    return
+                with self._condition:
+                    self._durable = batch_end
+                    self._condition.notify_all()
+            if closing:
+                return
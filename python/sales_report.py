@@ -0,0 +1,87 @@
+from array import array
+
+from receipt_journal import read_journal
+
+
+class SalesAggregator:
+    """Running sales totals over a stream of receipts or journal records.
+
+    Totals live in flat arrays indexed by product name and discount
+    description, so memory grows with the number of distinct keys rather than
+    the number of receipts. Aggregates built by parallel workers can be merged.
+    """
+
+    def __init__(self):
+        self._product_index = {}
+        self._quantities = array('d')
+        self._revenue = array('d')
+        self._discount_index = {}
+        self._discount_amounts = array('d')
+        self._discount_counts = array('q')
+        self.receipt_count = 0
+        self.loyalty_points_issued = 0
+
+    def add_receipt(self, receipt):
+        for item in receipt.items:
+            self._add_item(item.product.name, item.quantity, item.total_price)
+        for discount in receipt.discounts:
+            self._add_discount(discount.description, discount.discount_amount, 1)
+        self.receipt_count += 1
+        self.loyalty_points_issued += receipt.loyalty_points
+
+    def add_record(self, record):
+        for name, quantity, _, total_price in record.items:
+            self._add_item(name, quantity, total_price)
+        for _, description, amount in record.discounts:
+            self._add_discount(description, amount, 1)
+        self.receipt_count += 1
+        self.loyalty_points_issued += record.loyalty_points
+
+    def add_journal(self, path):
+        for record in read_journal(path):
+            self.add_record(record)
+
+    def merge(self, other):
+        for name, i in other._product_index.items():
+            self._add_item(name, other._quantities[i], other._revenue[i])
+        for description, i in other._discount_index.items():
+            self._add_discount(description, other._discount_amounts[i], other._discount_counts[i])
+        self.receipt_count += other.receipt_count
+        self.loyalty_points_issued += other.loyalty_points_issued
+        return self
+
+    def revenue_by_product(self):
+        return {name: self._revenue[i] for name, i in self._product_index.items()}
+
+    def quantity_by_product(self):
+        return {name: self._quantities[i] for name, i in self._product_index.items()}
+
+    def discount_spend_by_description(self):
+        """Total given away per offer description (positive amounts) and how often it applied."""
+        return {description: (-self._discount_amounts[i], self._discount_counts[i])
+                for description, i in self._discount_index.items()}
+
+    def _add_item(self, name, quantity, total_price):
+        i = self._product_index.get(name)
+        if i is None:
+            i = self._product_index[name] = len(self._revenue)
+            self._quantities.append(0.0)
+            self._revenue.append(0.0)
+        self._quantities[i] += quantity
+        self._revenue[i] += total_price
+
+    def _add_discount(self, description, amount, count):
+        i = self._discount_index.get(description)
+        if i is None:
+            i = self._discount_index[description] = len(self._discount_amounts)
+            self._discount_amounts.append(0.0)
+            self._discount_counts.append(0)
+        self._discount_amounts[i] += amount
+        self._discount_counts[i] += count
+
+
+def aggregate(receipts):
+    aggregator = SalesAggregator()
+    for receipt in receipts:
+        aggregator.add_receipt(receipt)
+    return aggregator
@@ -18,8 +18,8 @@ class ShoppingCart:
     def product_quantities(self):
         return self._product_quantities
 
-    def add_item_quantity(self, product, quantity):
-        self._items.append(ProductQuantity(product, quantity))
+    def add_item_quantity(self, product, quantity, line_price=None):
+        self._items.append(ProductQuantity(product, quantity, line_price))
         if product in self._product_quantities.keys():
             self._product_quantities[product] = self._product_quantities[product] + quantity
         else:
@@ -0,0 +1,37 @@
+"""
+Measures the cold-start import cost of the checkout modules with `python -X importtime`.
+
+python startup_benchmark.py [module ...]
+"""
+
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULES = ["teller", "shopping_cart", "texttest_fixture"]
+
+
+def import_times(module):
+    """Returns {imported module: (self us, cumulative us)} for a fresh `import module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main(args):
+    modules = args or DEFAULT_MODULES
+    for module in modules:
+        times = import_times(module)
+        print(f"{module:<20} {times[module][1] / 1000.0:8.2f} ms  ({len(times)} modules imported)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
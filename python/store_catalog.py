@@ -0,0 +1,73 @@
+from catalog import SupermarketCatalog
+
+
+class StoreCatalog(SupermarketCatalog):
+    """Store-scoped view: the store's overlay first, then the shared national prices."""
+
+    def __init__(self, base, store_id, overlay):
+        self.base = base
+        self.store_id = store_id
+        self._overlay = overlay
+        self._base_prices = base.prices
+
+    @property
+    def products(self):
+        return self.base.products
+
+    def add_product(self, product, price):
+        """Sets the store's price for a product of the national catalog; new
+        products need a national price first, so they go through the base."""
+        self.base.set_store_price(self.store_id, product, price)
+
+    def unit_price(self, product):
+        price = self._overlay.get(product.name)
+        if price is None:
+            return self._base_prices[product.name]
+        return price
+
+
+class ShardedCatalog(SupermarketCatalog):
+    """National price list shared by every store, plus small per-store price overlays.
+
+    Stores in one process share the base tables; each overlay only holds the
+    store's local deltas.
+    """
+
+    def __init__(self):
+        self.products = {}
+        self.prices = {}
+        self._overlays = {}
+
+    def add_product(self, product, price):
+        if price is None:
+            raise ValueError(f"{product.name} needs a national price")
+        self.products[product.name] = product
+        self.prices[product.name] = price
+
+    def unit_price(self, product):
+        return self.prices[product.name]
+
+    def _check_known(self, store_id, names):
+        unknown = [name for name in names if name not in self.products]
+        if unknown:
+            raise KeyError(f"Unknown products for store {store_id}: {', '.join(sorted(unknown))}")
+
+    def set_store_prices(self, store_id, prices):
+        """Replace a store's overlay with `prices` (product name -> local price)."""
+        self._check_known(store_id, prices)
+        overlay = self._overlays.setdefault(store_id, {})
+        overlay.clear()
+        overlay.update(prices)
+
+    def set_store_price(self, store_id, product, price):
+        self._check_known(store_id, [product.name])
+        self._overlays.setdefault(store_id, {})[product.name] = price
+
+    def clear_store_price(self, store_id, product):
+        self._overlays.get(store_id, {}).pop(product.name, None)
+
+    def store_overlay_size(self, store_id):
+        return len(self._overlays.get(store_id, ()))
+
+    def for_store(self, store_id):
+        return StoreCatalog(self, store_id, self._overlays.setdefault(store_id, {}))
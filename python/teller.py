@@ -1,50 +1,78 @@
 import datetime
+import threading
 
 from model_objects import OfferFactory, BundleOffer
-from receipt import Receipt
-from discount_calculator import DiscountCalculator
-from loyalty_service import LoyaltyService
+from offer_rules import OfferRules
+from discount_memo import DiscountMemo
 
 class Teller:
 
     def __init__(self, catalog):
         self.catalog = catalog
-        self.offers = {}
-        self.bundle_offers = []
         self.offer_factory = OfferFactory()
-        self.loyalty_service = LoyaltyService()
+        self._loyalty_service = None
+        self.profiler = None
+        self.discount_memo = DiscountMemo()
+        self._rules = OfferRules()
+        self._rules_lock = threading.Lock()
+
+    @property
+    def loyalty_service(self):
+        if self._loyalty_service is None:
+            from loyalty_service import LoyaltyService
+            self._loyalty_service = LoyaltyService()
+        return self._loyalty_service
+
+    @property
+    def rules(self):
+        return self._rules
+
+    @property
+    def offers(self):
+        return self._rules.offers
+
+    @property
+    def bundle_offers(self):
+        return self._rules.bundle_offers
+
+    def update_rules(self, change):
+        # Writers are serialized; readers never lock, they just pin self._rules.
+        with self._rules_lock:
+            self._rules = change(self._rules)
+            return self._rules
 
     def add_special_offer(self, offer_type, product, argument):
-        self.offers[product] = self.offer_factory.create(offer_type, product, argument)
+        offer = self.offer_factory.create(offer_type, product, argument)
+        self.update_rules(lambda rules: rules.with_offer(product, offer))
+
+    def remove_special_offer(self, product):
+        self.update_rules(lambda rules: rules.without_offer(product))
 
     def add_bundle_offer(self, bundle_products, discount_percentage):
-        self.bundle_offers.append(BundleOffer(bundle_products, discount_percentage))
+        bundle_offer = BundleOffer(bundle_products, discount_percentage)
+        self.update_rules(lambda rules: rules.with_bundle_offer(bundle_offer))
+        return bundle_offer
 
-    def checks_out_articles_from(self, the_cart, current_date=None, available_points=0):
+    def remove_bundle_offer(self, bundle_offer):
+        self.update_rules(lambda rules: rules.without_bundle_offer(bundle_offer))
+
+    def checks_out_articles_from(self, the_cart, current_date=None, available_points=0, trace=None,
+                                 calculator=None):
+        priced = self.price_cart(the_cart, current_date, trace, calculator)
+        return priced.to_receipt(available_points, self.loyalty_service)
+
+    def loyalty_curve(self, the_cart, current_date=None):
+        """Prices the cart once for any number of "redeem N points" previews."""
+        return self.price_cart(the_cart, current_date).loyalty_curve(self.loyalty_service)
+
+    def calculator(self, trace=None):
+        """Pins the current rules snapshot for a batch of checkouts."""
+        from pricing import cart_calculator
+        return cart_calculator(self.catalog, self._rules, self.profiler, trace, self.discount_memo)
+
+    def price_cart(self, the_cart, current_date=None, trace=None, calculator=None):
+        from pricing import price_cart
         if current_date is None:
             current_date = datetime.date.today()
-
-        receipt = Receipt()
-
-        self._add_items_to_receipt(receipt, the_cart)
-        self._apply_discounts(receipt, the_cart, current_date)
-        self.loyalty_service.apply_reduction(receipt, available_points)
-        self.loyalty_service.calculate_points_earned(receipt)
-
-        return receipt
-
-    def _add_items_to_receipt(self, receipt, cart):
-        for item in cart.items:
-            unit_price = self.catalog.unit_price(item.product)
-            price = item.quantity * unit_price
-            receipt.add_product(item.product, item.quantity, unit_price, price)
-
-    def _apply_discounts(self, receipt, cart, current_date):
-        calculator = DiscountCalculator(self.catalog, self.offers, self.bundle_offers)
-        discounts = calculator.calculate_discounts(
-            cart.product_quantities, 
-            cart.coupons, 
-            current_date
-        )
-        for discount in discounts:
-            receipt.add_discount(discount)
+        return price_cart(self.catalog, self._rules, the_cart, current_date, self.profiler, trace,
+                          self.discount_memo, calculator)
@@ -0,0 +1,100 @@
+import datetime
+import struct
+import unittest
+from array import array
+
+from cart_codec import ProductIndex, CartView, encode_cart, decode_cart, park_carts, restore_carts
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+from weighed_goods import PricePerGramTable
+
+
+class CartCodecTest(unittest.TestCase):
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.index = ProductIndex([self.toothbrush, self.apples])
+        self.cart = ShoppingCart()
+        self.cart.add_item_quantity(self.apples, 1.234)
+        self.cart.add_item_quantity(self.toothbrush, 2.0)
+        self.cart.add_item_quantity(self.apples, 0.5)
+        self.cart.add_coupon(self.toothbrush, "TB-DEAL", datetime.date(2025, 1, 1), datetime.date(2025, 1, 10),
+                             SpecialOfferType.COUPON_DISCOUNT, {'threshold': 1, 'limit': 2, 'percent': 50.0})
+
+    def assertSameCart(self, expected, actual):
+        self.assertEqual([(i.product, i.quantity, i.line_price) for i in expected.items],
+                         [(i.product, i.quantity, i.line_price) for i in actual.items])
+        self.assertEqual(expected.product_quantities, actual.product_quantities)
+        self.assertEqual([vars(c) for c in expected.coupons], [vars(c) for c in actual.coupons])
+
+    def test_round_trip(self):
+        self.assertSameCart(self.cart, decode_cart(encode_cart(self.cart, self.index), self.index))
+
+    def test_view_reads_columns_in_place(self):
+        buffer = bytearray(encode_cart(self.cart, self.index))
+        view = CartView(buffer)
+
+        self.assertEqual([1, 0, 1], list(view.product_ids))
+        buffer[24:32] = bytes(8)  # first quantity, right after the header
+        self.assertEqual(0.0, view.quantities[0])
+
+    def test_bulk_park_and_restore(self):
+        empty = ShoppingCart()
+        carts = [self.cart, empty, self.cart]
+
+        restored = restore_carts(park_carts(carts, self.index), self.index)
+
+        self.assertEqual(3, len(restored))
+        for expected, actual in zip(carts, restored):
+            self.assertSameCart(expected, actual)
+
+    def test_rejects_other_versions(self):
+        buffer = bytearray(encode_cart(self.cart, self.index))
+        buffer[4] = 99
+        with self.assertRaises(ValueError):
+            CartView(buffer)
+
+    def test_rejects_truncated_carts(self):
+        buffer = encode_cart(self.cart, self.index)
+        for end in (len(buffer) - 4, 40, 10):
+            with self.subTest(end=end), self.assertRaises(ValueError):
+                decode_cart(buffer[:end], self.index)
+
+        parked = park_carts([self.cart, self.cart], self.index)
+        with self.assertRaises(ValueError):
+            restore_carts(parked[:-12], self.index)
+
+    def test_parked_records_start_aligned(self):
+        parked = park_carts([self.cart, ShoppingCart(), self.cart], self.index)
+
+        offset, starts = 0, []
+        while offset < len(parked):
+            length = int.from_bytes(parked[offset:offset + 8], "little")
+            starts.append(offset + 8)
+            offset += 8 + length + -length % 8
+        self.assertEqual([0, 0, 0], [start % 8 for start in starts])
+        self.assertEqual(3, len(restore_carts(parked, self.index)))
+
+    def test_weighed_line_keeps_its_rounded_price(self):
+        catalog = FakeCatalog()
+        catalog.add_product(self.apples, 1.99)
+        line = PricePerGramTable.from_catalog(catalog, [self.apples]).line(self.apples)
+        line.reweigh(1500)
+        cart = ShoppingCart()
+        line.add_to(cart)
+
+        restored = decode_cart(encode_cart(cart, self.index), self.index)
+
+        self.assertSameCart(cart, restored)
+        self.assertEqual(2.99, Teller(catalog).checks_out_articles_from(restored).total_price())
+
+    def test_reads_version_1_carts(self):
+        buffer = (struct.pack("<4sHHIIQ", b"CART", 1, 0, 2, 0, 0) + array('d', [2.0, 0.5]).tobytes()
+                  + array('I', [0, 1]).tobytes())
+
+        cart = decode_cart(buffer, self.index)
+
+        self.assertEqual([(self.toothbrush, 2.0, None), (self.apples, 0.5, None)],
+                         [(i.product, i.quantity, i.line_price) for i in cart.items])
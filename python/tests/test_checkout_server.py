@@ -0,0 +1,109 @@
+import asyncio
+import json
+import unittest
+
+from checkout_loadgen import run as run_load
+from checkout_server import CheckoutServer
+from model_objects import Product, ProductUnit, SpecialOfferType
+from offer_feed import FeedChanges
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class FlakyFeed:
+    def __init__(self):
+        self.polls = 0
+
+    def poll(self):
+        self.polls += 1
+        if self.polls == 1:
+            raise OSError("feed unreadable")
+        return FeedChanges(rejected=[("rice,TWO_FOR_AMOUNT", "TypeError")])
+
+
+class CheckoutServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.catalog = FakeCatalog()
+        for name, unit, price in (("toothbrush", ProductUnit.EACH, 0.99), ("apples", ProductUnit.KILO, 1.99),
+                                  ("toothpaste", ProductUnit.EACH, 1.79), ("orange juice", ProductUnit.EACH, 2.00)):
+            self.catalog.add_product(Product(name, unit), price)
+        self.teller = Teller(self.catalog)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.catalog.products["toothbrush"], 0.0)
+        self.server = await CheckoutServer(self.teller, self.catalog, batch_window=0.005).start(port=0)
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def request(self, reader, writer, method, path, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+                     .encode("latin-1") + body)
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        length = int(head.lower().split(b"content-length: ")[1].split(b"\r\n")[0])
+        return status, await reader.readexactly(length)
+
+    async def test_checkouts_share_a_keep_alive_connection(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        try:
+            status, body = await self.request(reader, writer, "POST", "/checkout",
+                                              {"items": [{"name": "toothbrush", "quantity": 3}]})
+            self.assertEqual(200, status)
+            receipt = json.loads(body)
+            self.assertAlmostEqual(1.98, receipt["total"])
+            self.assertEqual("3 for 2", receipt["discounts"][0]["description"])
+
+            status, body = await self.request(reader, writer, "POST", "/checkout",
+                                              {"items": [{"name": "apples", "quantity": 2}], "format": "text"})
+            self.assertEqual(200, status)
+            self.assertIn("Total:", body.decode("utf-8"))
+        finally:
+            writer.close()
+
+    async def test_bad_requests(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        try:
+            status, body = await self.request(reader, writer, "POST", "/checkout", {"items": [{"name": "caviar"}]})
+            self.assertEqual(400, status)
+            self.assertIn("caviar", json.loads(body)["error"])
+            status, _ = await self.request(reader, writer, "GET", "/checkout")
+            self.assertEqual(405, status)
+        finally:
+            writer.close()
+
+    async def test_concurrent_requests_are_batched(self):
+        _, _, p99 = await run_load(connections=16, requests=5, port=self.server.port)
+
+        self.assertEqual(80, self.server.requests)
+        self.assertLess(self.server.batches, self.server.requests)
+        self.assertGreater(p99, 0)
+
+    async def test_lone_request_does_not_wait_for_the_batch_window(self):
+        server = await CheckoutServer(self.teller, self.catalog, batch_window=60).start(port=0)
+        try:
+            cart = ShoppingCart()
+            cart.add_item_quantity(self.catalog.products["toothbrush"], 3.0)
+            receipt = await asyncio.wait_for(server.checkout(cart, None, 0), 10)
+        finally:
+            await server.close()
+
+        self.assertAlmostEqual(1.98, receipt.total_price())
+        self.assertEqual(1, server.batches)
+
+    async def test_offer_watcher_survives_failed_polls(self):
+        feed = FlakyFeed()
+        with self.assertLogs("checkout_server") as logs:
+            server = await CheckoutServer(self.teller, self.catalog, offer_feed=feed, feed_interval=0.01).start(port=0)
+            try:
+                for _ in range(100):
+                    if feed.polls >= 3:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await server.close()
+
+        self.assertGreaterEqual(feed.polls, 3)
+        self.assertIn("Offer feed reload failed", logs.output[0])
+        self.assertIn("rice,TWO_FOR_AMOUNT", logs.output[1])
@@ -0,0 +1,103 @@
+import datetime
+import unittest
+
+from coupon_tiers import CouponTier, TieredCoupon, best_stack
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+TODAY = datetime.date(2025, 1, 1)
+TIERED = {'tiers': [{'threshold': 12, 'limit': 12, 'percent': 20.0},
+                    {'threshold': 6, 'limit': 6, 'percent': 10.0}]}
+
+
+class CountingTier(CouponTier):
+    __slots__ = ("calls",)
+
+    def __init__(self, threshold, limit, percent):
+        super().__init__(threshold, limit, percent)
+        self.calls = 0
+
+    def savings(self, items, unit_price):
+        self.calls += 1
+        return super().savings(items, unit_price)
+
+
+class CouponTiersTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.cart = ShoppingCart()
+        self.juice = Product("orange juice", ProductUnit.EACH)
+        self.catalog.add_product(self.juice, 2.00)
+
+    def add_coupon(self, code, argument):
+        self.cart.add_coupon(self.juice, code, TODAY, TODAY, SpecialOfferType.COUPON_DISCOUNT, argument)
+
+    def checkout(self, quantity):
+        self.cart.add_item_quantity(self.juice, quantity)
+        return self.teller.checks_out_articles_from(self.cart, current_date=TODAY)
+
+    def test_best_tier_saves_the_most(self):
+        coupon = TieredCoupon.from_argument(TIERED)
+        self.assertIsNone(coupon.best_tier(6))
+        self.assertEqual(6, coupon.best_tier(7).threshold)
+        self.assertEqual(6, coupon.best_tier(12).threshold)
+        # 13 items: 6 at 10% beats 1 at 20%
+        self.assertEqual(6, coupon.best_tier(13).threshold)
+        self.assertEqual(12, coupon.best_tier(16).threshold)
+
+    def test_redundant_coupon_does_not_change_the_discount(self):
+        self.catalog.add_product(self.juice, 1.00)
+        self.add_coupon("OJ-TIER", TIERED)
+        single = self.checkout(13.0)
+        self.add_coupon("OJ-TIER-2", TIERED)
+        stacked = self.teller.checks_out_articles_from(self.cart, current_date=TODAY)
+
+        self.assertAlmostEqual(-0.60, sum(d.discount_amount for d in single.discounts))
+        self.assertAlmostEqual(-0.60, sum(d.discount_amount for d in stacked.discounts))
+
+    def test_tiered_coupon_applies_best_tier(self):
+        self.add_coupon("OJ-TIER", TIERED)
+        receipt = self.checkout(20.0)
+
+        # 8 items past the 12 threshold at 20% off 2.00
+        self.assertAlmostEqual(40.00 - 3.20, receipt.total_price(), places=2)
+        self.assertEqual("Coupon 20.0% off next 12 items", receipt.discounts[0].description)
+
+    def test_single_tier_coupon_is_unchanged(self):
+        self.add_coupon("OJ-HALF", {'threshold': 6, 'limit': 6, 'percent': 50.0})
+        receipt = self.checkout(24.0)
+
+        self.assertAlmostEqual(42.00, receipt.total_price(), places=2)
+        self.assertEqual(1, len(receipt.discounts))
+
+    def test_stacked_coupons_beat_first_come_first_served(self):
+        # On its own the first coupon would swallow all 12 items for 2.00 off.
+        self.add_coupon("OJ-WIDE", {'threshold': 2, 'limit': 10, 'percent': 10.0})
+        self.add_coupon("OJ-DEEP", {'threshold': 3, 'limit': 3, 'percent': 50.0})
+        receipt = self.checkout(12.0)
+
+        # DEEP takes 6 items (3.00 off), WIDE the other 6 (0.80 off)
+        self.assertAlmostEqual(24.00 - 3.80, receipt.total_price(), places=2)
+        self.assertEqual(["Coupon 10.0% off next 10 items", "Coupon 50.0% off next 3 items"],
+                         [d.description for d in receipt.discounts])
+
+    def test_best_stack_prefers_consuming_more_items_on_ties(self):
+        coupon = TieredCoupon([CouponTier(2, 2, 50.0)])
+        self.assertEqual([(0, coupon.tiers[0], 4)], best_stack([coupon], 10, 1.0))
+
+    def test_best_stack_gives_up_beyond_max_cells(self):
+        coupons = [TieredCoupon.from_argument(TIERED), TieredCoupon.from_argument(TIERED)]
+        self.assertIsNone(best_stack(coupons, 48, 2.0, max_cells=10))
+
+    def test_huge_limits_give_up_before_building_tables(self):
+        coupons = [TieredCoupon([CountingTier(0, 3_000_000, 10.0)]) for _ in range(2)]
+
+        self.assertIsNone(best_stack(coupons, 3_000_000, 1.0))
+        self.assertEqual(0, sum(coupon.tiers[0].calls for coupon in coupons))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import datetime
+import unittest
+
+from decision_trace import DecisionTrace, sampled_trace
+from model_objects import Product, ProductUnit, SpecialOfferType
+from pricing_profiler import BUNDLE, COUPON, OFFER
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class DecisionTraceTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.chocolate = Product("chocolate", ProductUnit.EACH)
+        self.juice = Product("orange juice", ProductUnit.EACH)
+        for product, price in ((self.toothbrush, 0.99), (self.toothpaste, 1.79),
+                               (self.chocolate, 5.00), (self.juice, 2.00)):
+            self.catalog.add_product(product, price)
+        self.teller.add_bundle_offer({self.toothbrush: 1.0, self.toothpaste: 1.0}, 10.0)
+        self.teller.add_bundle_offer({self.chocolate: 1.0, self.toothpaste: 1.0}, 10.0)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.juice, 0.0)
+        self.cart = ShoppingCart()
+        for product in (self.toothbrush, self.toothpaste, self.chocolate):
+            self.cart.add_item_quantity(product, 1.0)
+        self.cart.add_item_quantity(self.juice, 8.0)
+        self.cart.add_coupon(self.juice, "OJ-JAN", datetime.date(2025, 1, 1), datetime.date(2025, 1, 10),
+                             SpecialOfferType.COUPON_DISCOUNT, {'threshold': 2, 'limit': 2, 'percent': 50.0})
+
+    def checkout(self, today, trace):
+        return self.teller.checks_out_articles_from(self.cart, current_date=today, trace=trace)
+
+    def test_explains_bundle_choice_and_coupon_acceptance(self):
+        trace = DecisionTrace()
+        self.checkout(datetime.date(2025, 1, 5), trace)
+
+        events = [(e.kind, e.subject, e.outcome) for e in trace.events()]
+        self.assertEqual([
+            (BUNDLE, "Bundle 10.0% (toothbrush, toothpaste)", "candidate"),
+            (BUNDLE, "Bundle 10.0% (chocolate, toothpaste)", "candidate"),
+            (BUNDLE, "Bundle 10.0% (chocolate, toothpaste)", "applied"),
+            (BUNDLE, "Bundle 10.0% (toothbrush, toothpaste)", "incomplete"),
+            (BUNDLE, "Bundle 10.0% (chocolate, toothpaste)", "incomplete"),
+            (COUPON, "OJ-JAN", "accepted"),
+            (OFFER, "orange juice", "3 for 2"),
+        ], events)
+        self.assertEqual({"orange juice": 4}, trace.events()[5].consumed)
+        self.assertEqual({"orange juice": 4.0}, trace.events()[6].consumed)
+
+    def test_explains_why_a_coupon_was_rejected(self):
+        trace = DecisionTrace()
+        self.checkout(datetime.date(2025, 2, 1), trace)
+
+        [coupon] = [e for e in trace.events() if e.kind == COUPON]
+        self.assertEqual("rejected: 2025-02-01 outside 2025-01-01..2025-01-10", coupon.outcome)
+
+    def test_ring_buffer_keeps_the_latest_events(self):
+        trace = DecisionTrace(capacity=3)
+        for i in range(5):
+            trace.record(OFFER, f"product {i}", "applied")
+
+        self.assertEqual(2, trace.dropped)
+        self.assertEqual(["product 2", "product 3", "product 4"], [e.subject for e in trace.events()])
+        self.assertIn("2 earlier decisions dropped", trace.format())
+
+    def test_sampling(self):
+        self.assertIsNone(sampled_trace(0.01, rng=lambda: 0.5))
+        self.assertIsInstance(sampled_trace(0.01, rng=lambda: 0.001), DecisionTrace)
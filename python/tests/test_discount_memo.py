@@ -0,0 +1,63 @@
+import unittest
+
+from discount_memo import DiscountMemo
+from model_objects import Product, ProductUnit, SpecialOfferType
+from offers import ThreeForTwoOffer, TenPercentDiscountOffer
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class DiscountMemoTest(unittest.TestCase):
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.three_for_two = ThreeForTwoOffer(self.toothbrush, 0.0)
+        self.memo = DiscountMemo(max_entries=2)
+
+    def test_repeated_lines_share_one_discount(self):
+        first = self.memo.discount(self.three_for_two, 3.0, 0.99)
+        second = self.memo.discount(self.three_for_two, 3.0, 0.99)
+
+        self.assertIs(first, second)
+        self.assertEqual((1, 1), (self.memo.hits, self.memo.misses))
+        self.assertEqual(0.5, self.memo.hit_rate)
+
+    def test_lines_without_discount_are_remembered(self):
+        self.assertIsNone(self.memo.discount(self.three_for_two, 1.0, 0.99))
+        self.assertIsNone(self.memo.discount(self.three_for_two, 1.0, 0.99))
+        self.assertEqual(1, self.memo.hits)
+
+    def test_price_and_offer_are_part_of_the_key(self):
+        other_offer = ThreeForTwoOffer(self.toothbrush, 0.0)
+        self.assertIsNot(self.memo.discount(self.three_for_two, 3.0, 0.99),
+                         self.memo.discount(self.three_for_two, 3.0, 1.09))
+        self.assertIsNot(self.memo.discount(self.three_for_two, 3.0, 0.99),
+                         self.memo.discount(other_offer, 3.0, 0.99))
+
+    def test_table_is_bounded(self):
+        for quantity in (3.0, 4.0, 5.0, 6.0):
+            self.memo.discount(self.three_for_two, quantity, 0.99)
+
+        self.assertEqual(2, len(self.memo))
+        self.assertEqual(2, self.memo.evictions)
+
+    def test_descriptions_are_built_once_per_offer(self):
+        offer = TenPercentDiscountOffer(self.toothbrush, 10.0)
+        self.assertIs(offer.calculate_discount(1.0, 1.0).description,
+                      offer.calculate_discount(2.0, 1.0).description)
+
+    def test_shared_discounts_cannot_be_changed_through_a_receipt(self):
+        catalog = FakeCatalog()
+        catalog.add_product(self.toothbrush, 0.99)
+        teller = Teller(catalog)
+        teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.0)
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 3.0)
+
+        first = teller.checks_out_articles_from(cart)
+        with self.assertRaises(AttributeError):
+            first.discounts[0].discount_amount = -0.5
+
+        second = teller.checks_out_articles_from(cart)
+        self.assertIs(first.discounts[0], second.discounts[0])
+        self.assertAlmostEqual(1.98, second.total_price())
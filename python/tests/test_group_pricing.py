@@ -0,0 +1,121 @@
+import operator
+import unittest
+from array import array
+
+from group_pricing import group_discounts, buy_n_pay_m_discount, n_for_amount_discount
+from model_objects import Product, ProductUnit, SpecialOfferType, OfferFactory, ThreeForTwoOffer
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Column:
+    """Minimal column with elementwise operators, standing in for a NumPy array."""
+
+    def __init__(self, values):
+        self.values = list(values)
+
+    def _apply(self, op, other):
+        others = other.values if isinstance(other, Column) else [other] * len(self.values)
+        return Column(op(a, b) for a, b in zip(self.values, others))
+
+    def __floordiv__(self, other):
+        return self._apply(operator.floordiv, other)
+
+    def __mod__(self, other):
+        return self._apply(operator.mod, other)
+
+    def __mul__(self, other):
+        return self._apply(operator.mul, other)
+
+    def __rmul__(self, other):
+        return self._apply(operator.mul, other)
+
+    def __add__(self, other):
+        return self._apply(operator.add, other)
+
+    def __sub__(self, other):
+        return self._apply(operator.sub, other)
+
+    def __ge__(self, other):
+        return self._apply(operator.ge, other)
+
+
+class GroupPricingTest(unittest.TestCase):
+    def test_buy_n_pay_m_matches_three_for_two(self):
+        # 7 items, 3 for 2: pay 2 + 2 + 1 = 5 items
+        self.assertAlmostEqual(buy_n_pay_m_discount(7.0, 0.99, 3, 2), 2 * 0.99)
+
+    def test_n_for_amount(self):
+        # 11 items, 5 for 4.00: 2 * 4.00 + 1 * 1.00
+        self.assertAlmostEqual(n_for_amount_discount(11.0, 1.00, 5, 4.00), 11.00 - 9.00)
+
+    def test_partial_group_saves_nothing(self):
+        # 2.5 units under 3 for 2 have no complete group, like BuyNPayMOffer
+        self.assertEqual(0.0, buy_n_pay_m_discount(2.5, 1.0, 3, 2))
+
+    def test_batch_skips_lines_without_a_complete_group(self):
+        quantities, unit_prices, group_prices = [2.0, 2.5, 3.0, 6.0], [1.0, 1.0, 1.0, 0.5], [2.0, 2.0, 2.0, 1.0]
+        expected = [0.0, 0.0, 1.0, 1.0]
+        for columns in ((quantities, unit_prices, group_prices),
+                        (array('d', quantities), array('d', unit_prices), array('d', group_prices))):
+            with self.subTest(type=type(columns[0]).__name__):
+                discounts = group_discounts(columns[0], columns[1], 3, columns[2])
+                self.assertEqual(4, len(discounts))
+                for actual, wanted in zip(discounts, expected):
+                    self.assertAlmostEqual(wanted, actual)
+
+    def test_elementwise_columns_go_through_the_kernel_at_once(self):
+        discounts = group_discounts(Column([2.0, 2.5, 3.0, 6.0]), Column([1.0, 1.0, 1.0, 0.5]), 3,
+                                    Column([2.0, 2.0, 2.0, 1.0]))
+        self.assertEqual([0.0, 0.0, 1.0, 1.0], discounts.values)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy_columns(self):
+        discounts = group_discounts(numpy.array([2.0, 2.5, 3.0, 6.0]), numpy.array([1.0, 1.0, 1.0, 0.5]), 3,
+                                    numpy.array([2.0, 2.0, 2.0, 1.0]))
+        self.assertEqual([0.0, 0.0, 1.0, 1.0], discounts.tolist())
+
+
+class OfferFactoryTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.cart = ShoppingCart()
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.catalog.add_product(self.toothbrush, 1.00)
+
+    def test_unknown_offer_type(self):
+        with self.assertRaises(ValueError):
+            OfferFactory(constructors={}).create(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.0)
+
+    def test_registered_constructor_is_used(self):
+        factory = OfferFactory(constructors={})
+        factory.register(SpecialOfferType.THREE_FOR_TWO, ThreeForTwoOffer)
+        offer = factory.create(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.0)
+        self.assertEqual("3 for 2", offer.calculate_discount(3.0, 1.00).description)
+
+    def test_buy_four_pay_three(self):
+        self.teller.add_special_offer(SpecialOfferType.BUY_N_PAY_M, self.toothbrush, {'buy': 4, 'pay': 3})
+        self.cart.add_item_quantity(self.toothbrush, 9.0)
+
+        receipt = self.teller.checks_out_articles_from(self.cart)
+
+        # 2 * 3.00 + 1 * 1.00 = 7.00
+        self.assertAlmostEqual(receipt.total_price(), 7.00, places=2)
+        self.assertEqual("4 for 3", receipt.discounts[0].description)
+
+    def test_ten_for_amount(self):
+        self.teller.add_special_offer(SpecialOfferType.N_FOR_AMOUNT, self.toothbrush, {'count': 10, 'amount': 5.0})
+        self.cart.add_item_quantity(self.toothbrush, 10.0)
+
+        receipt = self.teller.checks_out_articles_from(self.cart)
+
+        self.assertAlmostEqual(receipt.total_price(), 5.00, places=2)
+        self.assertEqual("10 for 5.0", receipt.discounts[0].description)
@@ -0,0 +1,31 @@
+import os
+import tempfile
+import unittest
+
+from legacy_equivalence import compare, baseline_ratio, record, speed_gate, MAX_SPEED_RATIO
+from tests import timing_test
+
+
+class LegacyEquivalenceTest(unittest.TestCase):
+    def test_receipts_match_the_legacy_engine(self):
+        for seed in (1, 2, 3):
+            with self.subTest(seed=seed):
+                mismatches, _ = compare(cart_count=200, seed=seed)
+                self.assertEqual([], mismatches[:3])
+
+    @timing_test
+    def test_engine_stays_within_the_speed_gate(self):
+        _, ratio = compare(cart_count=500, seed=2025)
+        self.assertLess(ratio, MAX_SPEED_RATIO)
+
+    def test_gate_follows_the_recorded_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.jsonl")
+            self.assertIsNone(baseline_ratio(path))
+            record(path, 100, 1, [], 1.7)
+            record(path, 100, 1, [], 1.25)
+
+            self.assertEqual(1.25, baseline_ratio(path))
+        self.assertAlmostEqual(1.5, speed_gate(1.25))
+        self.assertEqual(MAX_SPEED_RATIO, speed_gate(1.7))
+        self.assertEqual(MAX_SPEED_RATIO, speed_gate(None))
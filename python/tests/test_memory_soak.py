@@ -0,0 +1,45 @@
+import unittest
+
+from memory_soak import SimulatedDay, SoakSample, format_report, growing_sites, soak
+
+
+class LeakyDay(SimulatedDay):
+    """Keeps every receipt, the way a forgotten cache would."""
+
+    def __init__(self):
+        super().__init__()
+        self.kept = []
+
+    def check_out(self, count):
+        for _ in range(count):
+            cart, points = self.next_cart()
+            self.kept.append(self.teller.checks_out_articles_from(cart, self.date, points))
+
+
+class MemorySoakTest(unittest.TestCase):
+    def test_steady_traffic_does_not_grow(self):
+        samples = soak(checkouts=1500, snapshots=3)
+
+        self.assertEqual([0, 500, 1000, 1500], [sample.checkouts for sample in samples])
+        self.assertIn("discount_memo.py", samples[-1].modules())
+        # A short warm-up leaves the bounded discount memo still filling.
+        self.assertEqual([], growing_sites(samples, min_growth=32 * 1024))
+
+    def test_retained_receipts_are_reported_by_line(self):
+        samples = soak(checkouts=1500, snapshots=3, day=LeakyDay())
+
+        sites = growing_sites(samples)
+        self.assertIn("receipt.py", {site.filename for site in sites})
+        self.assertIn("monotonic growth:", format_report(samples))
+
+    def test_growth_must_continue_every_interval(self):
+        samples = [SoakSample(n, 0, 0, {("receipt.py", 10): size, ("offers.py", 50): other,
+                                        ("coupon_tiers.py", 26): step})
+                   for n, (size, other, step) in enumerate([(1000, 1000, 0), (6000, 9000, 0), (9000, 2000, 90000)])]
+
+        [site] = growing_sites(samples)
+        self.assertEqual(("receipt.py", 10, 8000), (site.filename, site.lineno, site.growth))
+
+
+if __name__ == "__main__":
+    unittest.main()
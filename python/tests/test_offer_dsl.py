@@ -0,0 +1,58 @@
+import unittest
+
+from model_objects import Product, ProductUnit, SpecialOfferType, OfferFactory
+from offer_dsl import CompiledOffer, compile_rule, rule_for
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+CLASSIC_OFFERS = [
+    (SpecialOfferType.THREE_FOR_TWO, 0.0),
+    (SpecialOfferType.BUY_N_PAY_M, {'buy': 4, 'pay': 3}),
+    (SpecialOfferType.TEN_PERCENT_DISCOUNT, 10.0),
+    (SpecialOfferType.TWO_FOR_AMOUNT, 1.5),
+    (SpecialOfferType.FIVE_FOR_AMOUNT, 4),
+    (SpecialOfferType.N_FOR_AMOUNT, {'count': 10, 'amount': 5.0}),
+    (SpecialOfferType.COUPON_DISCOUNT, {'threshold': 6, 'limit': 6, 'percent': 50.0}),
+]
+
+
+class OfferDslTest(unittest.TestCase):
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+
+    def test_rules_price_like_the_offer_classes(self):
+        factory = OfferFactory()
+        for offer_type, argument in CLASSIC_OFFERS:
+            classic = factory.create(offer_type, self.toothbrush, argument)
+            compiled = CompiledOffer(self.toothbrush, rule_for(offer_type, argument))
+            for quantity in (0.0, 1.0, 2.0, 2.5, 3.0, 5.0, 7.0, 11.0, 13.0, 20.0):
+                with self.subTest(offer_type=offer_type, quantity=quantity):
+                    expected = classic.calculate_discount(quantity, 0.99)
+                    actual = compiled.calculate_discount(quantity, 0.99)
+                    if expected is None:
+                        self.assertIsNone(actual)
+                    else:
+                        self.assertEqual(expected.description, actual.description)
+                        self.assertAlmostEqual(expected.discount_amount, actual.discount_amount, places=9)
+                        self.assertIs(self.toothbrush, actual.product)
+
+    def test_rules_are_compiled_once(self):
+        self.assertIs(compile_rule("buy 3 pay 2"), compile_rule("buy 3 pay 2"))
+
+    def test_unknown_rule(self):
+        with self.assertRaises(ValueError):
+            compile_rule("buy one get one")
+
+    def test_teller_accepts_rules(self):
+        catalog = FakeCatalog()
+        catalog.add_product(self.toothbrush, 1.00)
+        teller = Teller(catalog)
+        teller.add_special_offer(SpecialOfferType.RULE, self.toothbrush, "Buy 4  pay 3")
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 4.0)
+
+        receipt = teller.checks_out_articles_from(cart)
+
+        self.assertAlmostEqual(receipt.total_price(), 3.00, places=2)
+        self.assertEqual("4 for 3", receipt.discounts[0].description)
@@ -0,0 +1,181 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from model_objects import Product, ProductUnit
+from offer_feed import OfferFeed
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests import RUN_TIMING_TESTS
+from tests.fake_catalog import FakeCatalog
+
+HEADER = "name,offer,argument\n"
+
+
+class OfferFeedTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.toothbrush, 1.00)
+        self.catalog.add_product(self.toothpaste, 2.00)
+        self.catalog.add_product(self.apples, 2.00)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "offers.csv")
+        self.feed = OfferFeed(self.path, self.catalog, self.teller)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_feed(self, *rows):
+        with open(self.path, "w") as f:
+            f.write(HEADER + "\n".join(rows) + "\n")
+        # make sure the mtime/size signature moves even on coarse clocks
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_initial_load(self):
+        self.write_feed("toothbrush|toothpaste,BUNDLE,10.0", "apples,TEN_PERCENT_DISCOUNT,10.0")
+
+        changes = self.feed.poll()
+
+        self.assertEqual(2, changes.added)
+        self.assertIn(self.apples, self.teller.offers)
+        self.assertEqual(1, len(self.teller.bundle_offers))
+
+    def test_unchanged_file_is_not_reloaded(self):
+        self.write_feed("apples,TEN_PERCENT_DISCOUNT,10.0")
+        self.feed.poll()
+        version = self.teller.rules.version
+
+        self.assertFalse(self.feed.poll())
+        self.assertEqual(version, self.teller.rules.version)
+
+    def test_only_the_delta_is_applied(self):
+        self.write_feed("toothbrush|toothpaste,BUNDLE,10.0",
+                        "apples,TEN_PERCENT_DISCOUNT,10.0",
+                        "toothbrush,THREE_FOR_TWO,0.0")
+        self.feed.poll()
+        bundle = self.teller.bundle_offers[0]
+        apples_offer = self.teller.offers[self.apples]
+
+        self.write_feed("toothbrush|toothpaste,BUNDLE,10.0",
+                        "apples,TEN_PERCENT_DISCOUNT,20.0",
+                        "toothpaste,TWO_FOR_AMOUNT,3.0")
+        changes = self.feed.poll()
+
+        self.assertEqual((1, 1, 1), (changes.added, changes.removed, changes.changed))
+        self.assertIs(bundle, self.teller.bundle_offers[0])
+        self.assertIsNot(apples_offer, self.teller.offers[self.apples])
+        self.assertNotIn(self.toothbrush, self.teller.offers)
+        self.assertIn(self.toothpaste, self.teller.offers)
+
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.apples, 1.0)
+        receipt = self.teller.checks_out_articles_from(cart)
+        self.assertAlmostEqual(receipt.total_price(), 1.60, places=2)
+
+    def test_removed_bundle(self):
+        self.write_feed("toothbrush|toothpaste,BUNDLE,10.0")
+        self.feed.poll()
+        self.write_feed("apples,TEN_PERCENT_DISCOUNT,10.0")
+
+        changes = self.feed.poll()
+
+        self.assertEqual((1, 1, 0), (changes.added, changes.removed, changes.changed))
+        self.assertEqual((), self.teller.bundle_offers)
+
+    def test_bad_rows_are_reported_without_blocking_valid_edits(self):
+        self.write_feed("apples,TEN_PERCENT_DISCOUNT,10.0")
+        self.feed.poll()
+        self.write_feed("apples,TEN_PERCENT_DISCOUNT,20.0", "toothbrush,TWO_FOR_AMOUNT")
+
+        changes = self.feed.poll()
+
+        self.assertEqual(1, changes.changed)
+        self.assertEqual(["toothbrush,TWO_FOR_AMOUNT"], [line for line, _ in changes.rejected])
+        self.assertEqual(20.0, self.teller.offers[self.apples].argument)
+        self.assertNotIn(self.toothbrush, self.teller.offers)
+        self.assertFalse(self.feed.poll())
+
+    def test_typo_in_an_edited_row_keeps_the_live_offer(self):
+        self.write_feed("apples,TEN_PERCENT_DISCOUNT,10.0")
+        self.feed.poll()
+
+        self.write_feed("apples,TEN_PERCENT_DISCOUNT,1O.0")
+        changes = self.feed.poll()
+        self.assertEqual((0, 0, 0, 1), (changes.added, changes.removed, changes.changed, len(changes.rejected)))
+        self.assertEqual(10.0, self.teller.offers[self.apples].argument)
+
+        self.write_feed("apples,TEN_PERCENT_DISCOUNT,15.0")
+        self.assertEqual(1, self.feed.poll().changed)
+        self.assertEqual(15.0, self.teller.offers[self.apples].argument)
+
+    def test_held_offer_goes_when_its_row_is_deleted(self):
+        self.write_feed("apples,TEN_PERCENT_DISCOUNT,10.0")
+        self.feed.poll()
+        self.write_feed("apples,TEN_PERCENT_DISCOUNT,1O.0")
+        self.feed.poll()
+
+        self.write_feed("toothbrush,TEN_PERCENT_DISCOUNT,5.0")
+        changes = self.feed.poll()
+
+        self.assertEqual((1, 1), (changes.added, changes.removed))
+        self.assertNotIn(self.apples, self.teller.offers)
+
+    def test_watch_keeps_going_after_a_failed_poll(self):
+        feed = OfferFeed(self.directory.name, self.catalog, self.teller)  # a directory cannot be read
+        stop = threading.Event()
+        with self.assertLogs("offer_feed") as logs:
+            watcher = threading.Thread(target=feed.watch, args=(0.01, stop))
+            watcher.start()
+            time.sleep(0.1)
+            stop.set()
+            watcher.join()
+
+        self.assertGreater(len(logs.output), 1)
+        self.assertIn("Offer feed reload failed", logs.output[-1])
+
+    def test_rows_wait_for_their_product(self):
+        kale = Product("kale", ProductUnit.EACH)
+        self.write_feed("kale,TEN_PERCENT_DISCOUNT,10.0")
+        self.assertEqual(1, self.feed.poll().waiting)
+
+        self.catalog.add_product(kale, 3.00)
+        changes = self.feed.poll()
+
+        self.assertEqual((1, 0), (changes.added, changes.waiting))
+        self.assertIn(kale, self.teller.offers)
+
+    def test_large_feed_with_small_delta_reloads_quickly(self):
+        rows = []
+        for i in range(100_000):
+            product = Product(f"product {i}", ProductUnit.EACH)
+            self.catalog.add_product(product, 1.00)
+            rows.append(f"product {i},TEN_PERCENT_DISCOUNT,10.0")
+        self.write_feed(*rows)
+        self.feed.poll()
+
+        for i in range(0, 100_000, 100):
+            rows[i] = f"product {i},TEN_PERCENT_DISCOUNT,15.0"
+        self.write_feed(*rows)
+        start = time.perf_counter()
+        changes = self.feed.poll()
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(1000, changes.changed)
+        self.assertEqual(100_000, len(self.teller.offers))
+        if RUN_TIMING_TESTS:
+            self.assertLess(elapsed, 0.5)
+
+    def test_rule_rows_are_compiled(self):
+        self.write_feed("toothbrush,RULE,buy 4 pay 3")
+
+        self.feed.poll()
+
+        discount = self.teller.offers[self.toothbrush].calculate_discount(4.0, 1.00)
+        self.assertEqual("4 for 3", discount.description)
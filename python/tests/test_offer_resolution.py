@@ -0,0 +1,60 @@
+import unittest
+
+from catalog import SupermarketCatalog
+from discount_calculator import DiscountCalculator
+from model_objects import Product, ProductUnit, BundleOffer
+from offers import TenPercentDiscountOffer
+from offer_rules import OfferRules
+
+
+class OfferResolutionTest(unittest.TestCase):
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.rice = Product("rice", ProductUnit.EACH)
+        self.bundle = BundleOffer({self.toothbrush: 1.0, self.toothpaste: 1.0}, 10.0)
+        self.apples_offer = TenPercentDiscountOffer(self.apples, 10.0)
+        self.rules = OfferRules({self.apples: self.apples_offer}, [self.bundle])
+
+    def test_table_lists_bundles_and_offers_per_product(self):
+        table = self.rules.resolution_table
+
+        self.assertEqual((self.bundle,), table.get(self.toothbrush).bundle_offers)
+        self.assertIsNone(table.get(self.toothbrush).offer)
+        self.assertIs(self.apples_offer, table.get(self.apples).offer)
+        self.assertNotIn(self.rice, table)
+
+    def test_incremental_table_matches_a_full_rebuild(self):
+        self.rules.resolution_table
+        second_bundle = BundleOffer({self.toothpaste: 1.0, self.rice: 1.0}, 5.0)
+        rice_offer = TenPercentDiscountOffer(self.rice, 20.0)
+
+        changed = self.rules.with_changes(
+            offers={self.rice: rice_offer}, removed_offers=[self.apples],
+            bundle_offers=[second_bundle], removed_bundle_offers=[self.bundle])
+        rebuilt = OfferRules(changed.offers, changed.bundle_offers).resolution_table
+
+        for product in (self.toothbrush, self.toothpaste, self.apples, self.rice):
+            incremental = changed.resolution_table.get(product)
+            expected = rebuilt.get(product)
+            if expected is None:
+                self.assertIsNone(incremental)
+            else:
+                self.assertEqual(expected.bundle_offers, incremental.bundle_offers)
+                self.assertIs(expected.offer, incremental.offer)
+
+    def test_candidate_bundles_keep_snapshot_order(self):
+        second_bundle = BundleOffer({self.toothpaste: 1.0, self.rice: 1.0}, 5.0)
+        rules = self.rules.with_bundle_offer(second_bundle)
+
+        candidates = rules.resolution_table.candidate_bundles([self.rice, self.toothbrush])
+
+        self.assertEqual([self.bundle, second_bundle], candidates)
+
+    def test_lines_without_rules_skip_the_engine(self):
+        calculator = DiscountCalculator(SupermarketCatalog(), self.rules.offers, self.rules.bundle_offers,
+                                        self.rules.resolution_table)
+
+        # The real catalog raises on any price lookup, so reaching it would fail.
+        self.assertEqual([], calculator.calculate_discounts({self.rice: 3.0}, [], None))
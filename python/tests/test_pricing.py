@@ -0,0 +1,79 @@
+import datetime
+import unittest
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class PricingCoreTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.catalog.add_product(self.apples, 1.99)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.0)
+        self.cart = ShoppingCart()
+        self.cart.add_item_quantity(self.toothbrush, 3.0)
+        self.cart.add_item_quantity(self.apples, 2.5)
+        self.today = datetime.date(2025, 1, 1)
+
+    def test_calculator_pins_the_rules_snapshot(self):
+        calculator = self.teller.calculator()
+        self.teller.remove_special_offer(self.toothbrush)
+
+        pinned = self.teller.price_cart(self.cart, self.today, calculator=calculator)
+        current = self.teller.price_cart(self.cart, self.today)
+        self.assertAlmostEqual(2.97 + 4.975 - 0.99, pinned.total)
+        self.assertAlmostEqual(2.97 + 4.975, current.total)
+
+    def test_priced_basket_is_immutable(self):
+        priced = self.teller.price_cart(self.cart, self.today)
+
+        self.assertAlmostEqual(2.97 + 4.975, priced.subtotal)
+        self.assertAlmostEqual(2.97 + 4.975 - 0.99, priced.total)
+        self.assertEqual(1, len(priced.discounts))
+        with self.assertRaises(AttributeError):
+            priced.total = 0
+
+    def test_loyalty_what_ifs_match_a_full_checkout(self):
+        priced = self.teller.price_cart(self.cart, self.today)
+
+        for points in (0, 1, 15, 69, 70, 1000):
+            with self.subTest(points=points):
+                receipt = self.teller.checks_out_articles_from(self.cart, self.today, available_points=points)
+                outcome = priced.loyalty_outcome(points)
+                self.assertEqual(receipt.total_price(), outcome.final_total)
+                self.assertEqual(receipt.loyalty_points, outcome.points_earned)
+
+    def test_loyalty_curve_matches_a_full_checkout(self):
+        curve = self.teller.loyalty_curve(self.cart, self.today)
+
+        for points in range(0, 80):
+            with self.subTest(points=points):
+                receipt = self.teller.checks_out_articles_from(self.cart, self.today, available_points=points)
+                outcome = curve.outcome(points)
+                self.assertEqual(receipt.total_price(), outcome.final_total)
+                self.assertEqual(receipt.loyalty_points, outcome.points_earned)
+
+    def test_loyalty_curve_breakpoints(self):
+        curve = self.teller.price_cart(self.cart, self.today).loyalty_curve()
+
+        # 6.955 total: each 10 points (1.00) costs one earned point, 70 points cover it all
+        self.assertEqual([0, 10, 20, 30, 40, 50, 60], curve.breakpoints)
+        self.assertEqual([6, 5, 4, 3, 2, 1, 0], curve.earned)
+        self.assertEqual(70, curve.max_points)
+        self.assertEqual(curve.outcome(70), curve.outcome(500))
+
+    def test_what_ifs_reuse_the_priced_basket(self):
+        priced = self.teller.price_cart(self.cart, self.today)
+        self.catalog.prices.clear()
+
+        outcome = priced.loyalty_outcome(20)
+        receipt = priced.to_receipt(20)
+
+        self.assertAlmostEqual(2.00, outcome.redemption)
+        self.assertEqual(outcome.final_total, receipt.total_price())
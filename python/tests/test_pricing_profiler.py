@@ -0,0 +1,87 @@
+import datetime
+import threading
+import unittest
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from pricing_profiler import RuleProfiler, BUNDLE, COUPON, OFFER
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class RuleProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.profiler = RuleProfiler()
+        self.teller.profiler = self.profiler
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.juice = Product("orange juice", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        for product, price in ((self.toothbrush, 1.00), (self.toothpaste, 2.00),
+                               (self.juice, 2.00), (self.apples, 2.00)):
+            self.catalog.add_product(product, price)
+        self.teller.add_bundle_offer({self.toothbrush: 1.0, self.toothpaste: 1.0}, 10.0)
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.apples, 10.0)
+        self.teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.juice, 0.0)
+
+    def checkout(self, coupon_valid=True):
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 1.0)
+        cart.add_item_quantity(self.toothpaste, 1.0)
+        cart.add_item_quantity(self.apples, 1.0)
+        cart.add_item_quantity(self.juice, 2.0)
+        cart.add_coupon(self.juice, "OJ", datetime.date(2025, 1, 1), datetime.date(2025, 1, 10),
+                        SpecialOfferType.COUPON_DISCOUNT, {'threshold': 0, 'limit': 1, 'percent': 50.0})
+        today = datetime.date(2025, 1, 5) if coupon_valid else datetime.date(2025, 2, 1)
+        return self.teller.checks_out_articles_from(cart, current_date=today)
+
+    def test_counts_evaluations_applications_and_savings(self):
+        self.checkout()
+        self.checkout(coupon_valid=False)
+
+        bundle = self.profiler.stats(BUNDLE, "Bundle 10.0% (toothbrush, toothpaste)")
+        self.assertEqual(4, bundle.evaluations)
+        self.assertEqual(2, bundle.applications)
+        self.assertAlmostEqual(0.60, bundle.savings)
+
+        coupon = self.profiler.stats(COUPON, "OJ")
+        self.assertEqual((2, 1), (coupon.evaluations, coupon.applications))
+        self.assertAlmostEqual(1.00, coupon.savings)
+
+        self.assertEqual((2, 2), (self.profiler.stats(OFFER, "apples").evaluations,
+                                  self.profiler.stats(OFFER, "apples").applications))
+
+    def test_dead_promotions_show_up_as_never_applied(self):
+        self.checkout()
+
+        self.assertEqual([(OFFER, "orange juice")],
+                         [(s.kind, s.name) for s in self.profiler.never_applied()])
+
+    def test_table_is_sorted(self):
+        self.checkout()
+
+        rows = self.profiler.rows(sort_by="savings")
+        self.assertEqual(sorted((s.savings for s in rows), reverse=True), [s.savings for s in rows])
+        self.assertEqual(len(rows) + 1, len(self.profiler.format_table().splitlines()))
+
+    def test_lanes_can_share_a_profiler(self):
+        def lane():
+            for i in range(1000):
+                self.profiler.evaluated(OFFER, f"product {i % 50}", self.profiler.clock())
+                self.profiler.applied(OFFER, f"product {i % 50}", 0.5)
+
+        threads = [threading.Thread(target=lane) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        rows = self.profiler.rows()
+        self.assertEqual(50, len(rows))
+        self.assertEqual({(160, 160)}, {(s.evaluations, s.applications) for s in rows})
+        self.assertAlmostEqual(4000.0, sum(s.savings for s in rows))
+
+    def test_profiling_is_off_by_default(self):
+        self.assertIsNone(Teller(self.catalog).profiler)
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from model_objects import Product, ProductUnit, Discount
+from receipt import Receipt
+from receipt_journal import ReceiptJournal, read_journal, recover, compact
+
+
+class ReceiptJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "receipts.journal")
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.receipt = Receipt()
+        self.receipt.add_product(self.toothbrush, 3.0, 0.99, 2.97)
+        self.receipt.add_discount(Discount(self.toothbrush, "3 for 2", -0.99))
+        self.receipt.add_discount(Discount(None, "Loyalty Discount", -0.50))
+        self.receipt.add_loyalty_points(1)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        with ReceiptJournal(self.path) as journal:
+            self.assertEqual(1, journal.append(self.receipt))
+
+        [record] = list(read_journal(self.path))
+
+        self.assertEqual(1, record.sequence)
+        self.assertEqual([("toothbrush", 3.0, 0.99, 2.97)], record.items)
+        self.assertEqual([("toothbrush", "3 for 2", -0.99), (None, "Loyalty Discount", -0.50)],
+                         record.discounts)
+        self.assertAlmostEqual(1.48, record.total)
+        self.assertEqual(1, record.loyalty_points)
+
+    def test_concurrent_appends_are_all_durable(self):
+        with ReceiptJournal(self.path, commit_records=16) as journal:
+            threads = [threading.Thread(target=lambda: [journal.append(self.receipt) for _ in range(25)])
+                       for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        sequences = [record.sequence for record in read_journal(self.path)]
+        self.assertEqual(list(range(1, 201)), sequences)
+
+    def test_unencodable_receipt_does_not_hold_up_later_ones(self):
+        with ReceiptJournal(self.path) as journal:
+            with self.assertRaises(AttributeError):
+                journal.append(object())
+            self.assertEqual(2, journal.append(self.receipt))
+
+        self.assertEqual([2], [record.sequence for record in read_journal(self.path)])
+
+    def test_torn_tail_is_recovered_and_sequence_continues(self):
+        with ReceiptJournal(self.path) as journal:
+            journal.append(self.receipt)
+            journal.append(self.receipt)
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+
+        self.assertEqual(1, len(list(read_journal(self.path))))
+        self.assertEqual((1, 1), recover(self.path))
+
+        with ReceiptJournal(self.path) as journal:
+            self.assertEqual(2, journal.append(self.receipt))
+        self.assertEqual([1, 2], [record.sequence for record in read_journal(self.path)])
+
+    def test_compaction_drops_exported_records(self):
+        with ReceiptJournal(self.path) as journal:
+            for _ in range(5):
+                journal.append(self.receipt, wait=False)
+        compacted = os.path.join(self.directory.name, "compacted.journal")
+
+        self.assertEqual(2, compact(self.path, compacted, keep_from_sequence=4))
+        self.assertEqual([4, 5], [record.sequence for record in read_journal(compacted)])
+
+    def test_sequence_continues_after_compacting_everything(self):
+        with ReceiptJournal(self.path) as journal:
+            for _ in range(5):
+                journal.append(self.receipt, wait=False)
+
+        self.assertEqual(0, compact(self.path, self.path, keep_from_sequence=6))
+        with ReceiptJournal(self.path) as journal:
+            self.assertEqual(6, journal.append(self.receipt))
+        self.assertEqual([6], [record.sequence for record in read_journal(self.path)])
+
+    def test_torn_header_is_rewritten(self):
+        with open(self.path, "wb") as f:
+            f.write(b"RCP")
+
+        with ReceiptJournal(self.path) as journal:
+            self.assertEqual(1, journal.append(self.receipt))
+        self.assertEqual([1], [record.sequence for record in read_journal(self.path)])
+
+    def test_rejects_foreign_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"name,quantity\n")
+        with self.assertRaises(ValueError):
+            list(read_journal(self.path))
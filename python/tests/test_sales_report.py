@@ -0,0 +1,70 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from model_objects import Product, ProductUnit, Discount
+from receipt import Receipt
+from receipt_journal import ReceiptJournal
+from sales_report import SalesAggregator, aggregate
+
+
+class SalesAggregatorTest(unittest.TestCase):
+    def setUp(self):
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+
+    def make_receipt(self, apples_kilos=1.0):
+        receipt = Receipt()
+        receipt.add_product(self.toothbrush, 3.0, 1.00, 3.00)
+        receipt.add_product(self.apples, apples_kilos, 2.00, apples_kilos * 2.00)
+        receipt.add_discount(Discount(self.toothbrush, "3 for 2", -1.00))
+        receipt.add_loyalty_points(4)
+        return receipt
+
+    def test_running_totals(self):
+        report = aggregate([self.make_receipt(), self.make_receipt(apples_kilos=0.5)])
+
+        self.assertEqual(2, report.receipt_count)
+        self.assertEqual({"toothbrush": 6.00, "apples": 3.00}, report.revenue_by_product())
+        self.assertEqual({"toothbrush": 6.0, "apples": 1.5}, report.quantity_by_product())
+        self.assertEqual({"3 for 2": (2.00, 2)}, report.discount_spend_by_description())
+        self.assertEqual(8, report.loyalty_points_issued)
+
+    def test_merging_partial_aggregates(self):
+        left = aggregate([self.make_receipt()])
+        right = aggregate([self.make_receipt(), self.make_receipt()])
+
+        merged = SalesAggregator().merge(left).merge(right)
+
+        self.assertEqual(aggregate([self.make_receipt()] * 3).revenue_by_product(), merged.revenue_by_product())
+        self.assertEqual({"3 for 2": (3.00, 3)}, merged.discount_spend_by_description())
+        self.assertEqual(3, merged.receipt_count)
+
+    def test_journal_records_aggregate_like_receipts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "receipts.journal")
+            with ReceiptJournal(path) as journal:
+                journal.append(self.make_receipt(), wait=False)
+                journal.append(self.make_receipt(), wait=False)
+            report = SalesAggregator()
+            report.add_journal(path)
+
+        expected = aggregate([self.make_receipt(), self.make_receipt()])
+        self.assertEqual(expected.revenue_by_product(), report.revenue_by_product())
+        self.assertEqual(expected.discount_spend_by_description(), report.discount_spend_by_description())
+
+    def test_memory_does_not_grow_with_receipts(self):
+        receipt = self.make_receipt()
+        report = SalesAggregator()
+        report.add_receipt(receipt)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for _ in range(20_000):
+                report.add_receipt(receipt)
+            growth = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(growth, 10_000)
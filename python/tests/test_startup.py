@@ -0,0 +1,24 @@
+import unittest
+
+from startup_benchmark import import_times
+from tests import timing_test
+
+# Generous enough for a loaded CI box; a cold `import teller` is a few ms.
+TELLER_IMPORT_BUDGET_US = 50_000
+
+
+class StartupTest(unittest.TestCase):
+    @timing_test
+    def test_teller_import_stays_within_budget(self):
+        times = import_times("teller")
+        self.assertLess(times["teller"][1], TELLER_IMPORT_BUDGET_US)
+
+    def test_checkout_engine_is_imported_lazily(self):
+        times = import_times("teller")
+        for module in ("offers", "group_pricing", "discount_calculator", "loyalty_service"):
+            self.assertNotIn(module, times)
+
+    def test_fixture_defers_file_and_printing_modules(self):
+        times = import_times("texttest_fixture")
+        for module in ("csv", "receipt_printer", "tests.fake_catalog", "offer_feed"):
+            self.assertNotIn(module, times)
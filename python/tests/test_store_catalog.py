@@ -0,0 +1,70 @@
+import unittest
+
+from model_objects import Product, ProductUnit, SpecialOfferType
+from shopping_cart import ShoppingCart
+from store_catalog import ShardedCatalog
+from teller import Teller
+
+
+class ShardedCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = ShardedCatalog()
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.catalog.add_product(self.apples, 1.99)
+
+    def test_store_falls_back_to_national_price(self):
+        self.catalog.set_store_prices("berlin", {"apples": 2.49})
+        berlin = self.catalog.for_store("berlin")
+
+        self.assertEqual(2.49, berlin.unit_price(self.apples))
+        self.assertEqual(0.99, berlin.unit_price(self.toothbrush))
+        self.assertEqual(1.99, self.catalog.for_store("munich").unit_price(self.apples))
+
+    def test_stores_share_the_base_tables(self):
+        berlin = self.catalog.for_store("berlin")
+        munich = self.catalog.for_store("munich")
+
+        self.assertIs(berlin.products, munich.products)
+        self.catalog.add_product(self.apples, 1.79)
+        self.assertEqual(1.79, munich.unit_price(self.apples))
+
+    def test_existing_views_see_overlay_updates(self):
+        berlin = self.catalog.for_store("berlin")
+        self.catalog.set_store_price("berlin", self.toothbrush, 0.89)
+        self.assertEqual(0.89, berlin.unit_price(self.toothbrush))
+
+        self.catalog.clear_store_price("berlin", self.toothbrush)
+        self.assertEqual(0.99, berlin.unit_price(self.toothbrush))
+
+    def test_overlay_rejects_unknown_products(self):
+        caviar = Product("caviar", ProductUnit.EACH)
+        with self.assertRaises(KeyError):
+            self.catalog.set_store_prices("berlin", {"caviar": 99.0})
+        with self.assertRaises(KeyError):
+            self.catalog.set_store_price("berlin", caviar, 99.0)
+        with self.assertRaises(KeyError):
+            self.catalog.for_store("berlin").add_product(caviar, 99.0)
+        self.assertNotIn("caviar", self.catalog.products)
+
+    def test_store_view_prices_known_products_locally(self):
+        self.catalog.for_store("berlin").add_product(self.apples, 2.49)
+
+        self.assertEqual(2.49, self.catalog.for_store("berlin").unit_price(self.apples))
+        self.assertEqual(1.99, self.catalog.for_store("munich").unit_price(self.apples))
+
+    def test_products_need_a_national_price(self):
+        with self.assertRaises(ValueError):
+            self.catalog.add_product(Product("kale", ProductUnit.EACH), None)
+
+    def test_teller_prices_with_a_store_view(self):
+        self.catalog.set_store_prices("berlin", {"toothbrush": 1.00})
+        teller = Teller(self.catalog.for_store("berlin"))
+        teller.add_special_offer(SpecialOfferType.THREE_FOR_TWO, self.toothbrush, 0.0)
+        cart = ShoppingCart()
+        cart.add_item_quantity(self.toothbrush, 3.0)
+
+        receipt = teller.checks_out_articles_from(cart)
+
+        self.assertAlmostEqual(receipt.total_price(), 2.00, places=2)
@@ -0,0 +1,78 @@
+import threading
+import unittest
+
+from model_objects import Product, ProductUnit, SpecialOfferType, TenPercentDiscountOffer
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+
+
+class TellerSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.teller = Teller(self.catalog)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.toothpaste = Product("toothpaste", ProductUnit.EACH)
+        self.catalog.add_product(self.toothbrush, 1.00)
+        self.catalog.add_product(self.toothpaste, 2.00)
+
+    def test_snapshot_is_not_affected_by_later_updates(self):
+        self.teller.add_special_offer(SpecialOfferType.TEN_PERCENT_DISCOUNT, self.toothbrush, 10.0)
+        snapshot = self.teller.rules
+
+        self.teller.remove_special_offer(self.toothbrush)
+        self.teller.add_bundle_offer({self.toothbrush: 1.0, self.toothpaste: 1.0}, 10.0)
+
+        self.assertIn(self.toothbrush, snapshot.offers)
+        self.assertEqual((), snapshot.bundle_offers)
+        self.assertNotIn(self.toothbrush, self.teller.offers)
+        self.assertEqual(1, len(self.teller.bundle_offers))
+        self.assertGreater(self.teller.rules.version, snapshot.version)
+
+    def test_remove_bundle_offer(self):
+        bundle = self.teller.add_bundle_offer({self.toothbrush: 1.0, self.toothpaste: 1.0}, 10.0)
+        self.teller.remove_bundle_offer(bundle)
+        self.assertEqual((), self.teller.bundle_offers)
+
+    def test_concurrent_checkouts_see_whole_updates(self):
+        on = TenPercentDiscountOffer(self.toothbrush, 10.0), TenPercentDiscountOffer(self.toothpaste, 10.0)
+
+        def promotion_on(rules):
+            return rules.with_offer(self.toothbrush, on[0]).with_offer(self.toothpaste, on[1])
+
+        def promotion_off(rules):
+            return rules.without_offer(self.toothbrush).without_offer(self.toothpaste)
+
+        stop = threading.Event()
+        errors = []
+
+        def head_office():
+            while not stop.is_set():
+                self.teller.update_rules(promotion_on)
+                self.teller.update_rules(promotion_off)
+
+        def lane():
+            try:
+                for _ in range(300):
+                    cart = ShoppingCart()
+                    cart.add_item_quantity(self.toothbrush, 1.0)
+                    cart.add_item_quantity(self.toothpaste, 1.0)
+                    receipt = self.teller.checks_out_articles_from(cart)
+                    discounted = [d for d in receipt.discounts if d.product is not None]
+                    # Both products are promoted together, never just one of them.
+                    if len(discounted) not in (0, 2):
+                        errors.append(len(discounted))
+            except Exception as e:
+                errors.append(e)
+
+        writers = [threading.Thread(target=head_office) for _ in range(2)]
+        lanes = [threading.Thread(target=lane) for _ in range(8)]
+        for t in writers + lanes:
+            t.start()
+        for t in lanes:
+            t.join()
+        stop.set()
+        for t in writers:
+            t.join()
+
+        self.assertEqual([], errors)
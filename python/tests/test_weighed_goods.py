@@ -0,0 +1,54 @@
+import unittest
+
+from model_objects import Product, ProductUnit
+from shopping_cart import ShoppingCart
+from teller import Teller
+from tests.fake_catalog import FakeCatalog
+from weighed_goods import PricePerGramTable, round_down, simulated_scale, stable_reading
+
+
+class WeighedGoodsTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FakeCatalog()
+        self.apples = Product("apples", ProductUnit.KILO)
+        self.toothbrush = Product("toothbrush", ProductUnit.EACH)
+        self.catalog.add_product(self.apples, 1.99)
+        self.catalog.add_product(self.toothbrush, 0.99)
+        self.table = PricePerGramTable.from_catalog(
+            self.catalog, [self.apples, self.toothbrush], tares={self.apples: 12})
+
+    def test_only_weighed_products_get_a_price_per_gram(self):
+        self.assertEqual(199, self.table.price_per_gram(self.apples))
+        self.assertNotIn(self.toothbrush, self.table)
+
+    def test_tare_is_subtracted_before_pricing(self):
+        line = self.table.line(self.apples)
+        # 1262g - 12g tare = 1.250 kg * 1.99 = 2.4875 -> 2.49
+        self.assertEqual(249, line.reweigh(1262))
+        self.assertEqual(1250, line.net_grams)
+
+    def test_rounding_rules(self):
+        self.assertEqual(249, self.table.line(self.apples, tare_grams=0).reweigh(1250))
+        self.assertEqual(248, self.table.line(self.apples, tare_grams=0, rounding=round_down).reweigh(1250))
+
+    def test_reweigh_does_not_hit_the_catalog(self):
+        line = self.table.line(self.apples)
+        self.catalog.prices.clear()
+
+        self.assertEqual(0, line.reweigh(5))
+        self.assertEqual(199, line.reweigh(1012))
+
+    def test_receipt_charges_the_rounded_line_price(self):
+        grams = stable_reading(simulated_scale(1512, seed=1))
+        line = self.table.line(self.apples)
+        line.reweigh(grams)
+        cart = ShoppingCart()
+        line.add_to(cart)
+
+        receipt = Teller(self.catalog).checks_out_articles_from(cart)
+
+        self.assertEqual(1512, grams)
+        # 1.500 kg * 1.99 = 2.985 -> 2.99, not the catalog's unrounded 2.985
+        self.assertEqual(2.99, line.price)
+        self.assertEqual(line.price, receipt.items[0].total_price)
+        self.assertEqual(line.price, receipt.total_price())
@@ -4,18 +4,18 @@ Start texttest from a command prompt in the same folder as this file with this c
 texttest -a sr -d .
 """
 
-import sys, csv
+import sys
 import datetime
-from pathlib import Path
 
 from model_objects import Product, SpecialOfferType, ProductUnit
-from receipt_printer import ReceiptPrinter
 from shopping_cart import ShoppingCart
 from teller import Teller
-from tests.fake_catalog import FakeCatalog
 
 
 def read_catalog(catalog_file):
+    import csv
+    from tests.fake_catalog import FakeCatalog
+
     catalog = FakeCatalog()
     if not catalog_file.exists():
         return catalog
@@ -31,6 +31,9 @@ def read_catalog(catalog_file):
 
 
 def read_offers(offers_file, catalog, teller, basket):
+    import csv
+    from offer_feed import parse_argument
+
     if not offers_file.exists():
         return
         
@@ -90,6 +93,8 @@ def read_offers(offers_file, catalog, teller, basket):
 
 
 def read_basket(cart_file, catalog):
+    import csv
+
     cart = ShoppingCart()
     if not cart_file.exists():
         return cart
@@ -103,24 +108,10 @@ def read_basket(cart_file, catalog):
                 cart.add_item_quantity(product, quantity)
     return cart
 
-def parse_argument(arg_str):
-    if "=" in arg_str:
-        result = {}
-        pairs = arg_str.split(';')
-        for pair in pairs:
-            key, value = pair.split('=')
-            try:
-                if "." in value:
-                    result[key] = float(value)
-                else:
-                    result[key] = int(value)
-            except ValueError:
-                result[key] = value
-        return result
-    else:
-        return float(arg_str)
-
 def main(args):
+    from pathlib import Path
+    from receipt_printer import ReceiptPrinter
+
     catalog = read_catalog(Path("files/catalog.csv"))
     teller = Teller(catalog)
     basket = read_basket(Path("files/cart.csv"), catalog)
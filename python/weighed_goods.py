@@ -0,0 +1,100 @@
+"""
+Integer pricing of weighed (KILO) lines from gram readings.
+
+Prices are held as integer price-per-gram in thousandths of a cent, which is
+numerically the same as cents per kilo, so a line costs
+grams * price_per_gram / 1000 cents before rounding to the cent.
+"""
+
+import random
+
+from model_objects import ProductUnit
+
+
+def round_half_up(millicents):
+    return (millicents + 500) // 1000
+
+
+def round_down(millicents):
+    # Never round in the store's favour.
+    return millicents // 1000
+
+
+class PricePerGramTable:
+    def __init__(self, prices=None, tares=None):
+        self._prices = dict(prices or {})
+        self._tares = dict(tares or {})
+
+    @classmethod
+    def from_catalog(cls, catalog, products, tares=None):
+        prices = {}
+        for product in products:
+            if product.unit == ProductUnit.KILO:
+                prices[product] = int(round(catalog.unit_price(product) * 100))
+        return cls(prices, tares)
+
+    def __contains__(self, product):
+        return product in self._prices
+
+    def price_per_gram(self, product):
+        return self._prices[product]
+
+    def tare(self, product):
+        return self._tares.get(product, 0)
+
+    def line(self, product, tare_grams=None, rounding=round_half_up):
+        tare = self.tare(product) if tare_grams is None else tare_grams
+        return WeighedLine(product, self._prices[product], tare, rounding)
+
+
+class WeighedLine:
+    """One weighed line on a scale-integrated lane; re-weighing never touches the catalog."""
+
+    __slots__ = ("product", "price_per_gram", "tare_grams", "rounding", "net_grams", "price_cents")
+
+    def __init__(self, product, price_per_gram, tare_grams=0, rounding=round_half_up):
+        self.product = product
+        self.price_per_gram = price_per_gram
+        self.tare_grams = tare_grams
+        self.rounding = rounding
+        self.net_grams = 0
+        self.price_cents = 0
+
+    def reweigh(self, gross_grams):
+        net = gross_grams - self.tare_grams
+        self.net_grams = net if net > 0 else 0
+        self.price_cents = self.rounding(self.net_grams * self.price_per_gram)
+        return self.price_cents
+
+    @property
+    def kilos(self):
+        return self.net_grams / 1000.0
+
+    @property
+    def price(self):
+        return self.price_cents / 100.0
+
+    def add_to(self, cart):
+        # The cart keeps the legally rounded price instead of repricing the kilos.
+        cart.add_item_quantity(self.product, self.kilos, self.price)
+
+
+def simulated_scale(target_grams, settle_after=5, noise_grams=15, seed=None):
+    """Readings of an item being put on the scale: noisy until it settles on `target_grams`."""
+    rng = random.Random(seed)
+    for i in range(settle_after):
+        yield max(0, target_grams * (i + 1) // settle_after + rng.randint(-noise_grams, noise_grams))
+    while True:
+        yield target_grams
+
+
+def stable_reading(readings, window=3):
+    """First reading repeated `window` times in a row, as lanes accept a settled weight."""
+    last = None
+    repeats = 0
+    for grams in readings:
+        repeats = repeats + 1 if grams == last else 1
+        last = grams
+        if repeats >= window:
+            return grams
+    return last